@@ -0,0 +1,215 @@
+"""Benchmarks class definition, compilation, instantiation and parsing of
+synthetic command trees.
+
+    python benchmarks/bench.py                 run and print results
+    python benchmarks/bench.py --save          store results as the baseline
+    python benchmarks/bench.py --compare       fail on regressions vs baseline
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Type
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heated.app import App  # noqa: E402
+from heated.command import Command, get_command_meta  # noqa: E402
+from heated.compiler import compile_command_type  # noqa: E402
+from heated.help import render_help  # noqa: E402
+from heated.parameters import Argument, Flag, Option, Parameters  # noqa: E402
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+
+@dataclass(frozen=True)
+class TreeShape:
+    name: str
+    width: int
+    depth: int
+    parameters: int
+
+
+SHAPES = [
+    TreeShape("small", width=5, depth=2, parameters=5),
+    TreeShape("wide", width=300, depth=1, parameters=10),
+    TreeShape("deep", width=2, depth=8, parameters=5),
+    TreeShape("many-parameters", width=1, depth=1, parameters=1000),
+]
+
+
+def make_parameters(prefix: str, count: int) -> Type:
+    namespace = {"__annotations__": {}}
+    for index in range(count):
+        attr_name = f"{prefix}_{index}"
+        if index == 0:
+            namespace[attr_name] = Argument(f"{prefix.upper()}_{index}")
+        elif index % 3 == 0:
+            namespace[attr_name] = Flag(f"--{prefix}-{index}")
+            namespace["__annotations__"][attr_name] = bool
+            continue
+        else:
+            namespace[attr_name] = Option(f"--{prefix}-{index}")
+        namespace["__annotations__"][attr_name] = str
+    return type(f"{prefix}_parameters", (Parameters,), namespace)
+
+
+def make_tree(shape: TreeShape, level: int = 0, prefix: str = "main") -> Type:
+    annotations = {"params": make_parameters(prefix, shape.parameters)}
+    if level < shape.depth:
+        for index in range(shape.width):
+            child_prefix = f"{prefix}{index}"
+            annotations[child_prefix] = make_tree(shape, level + 1, child_prefix)
+    return type(prefix, (Command,), {"__annotations__": annotations})
+
+
+def walk(command_type: Type):
+    yield command_type
+    for subcommand in get_command_meta(command_type).subcommands.values():
+        yield from walk(subcommand)
+
+
+def leaf_chain(command_type: Type) -> list[Type]:
+    chain = [command_type]
+    while subcommands := list(get_command_meta(chain[-1]).subcommands.values()):
+        chain.append(subcommands[-1])
+    return chain
+
+
+def chain_args(chain: list[Type], shape: TreeShape) -> list[str]:
+    args = []
+    for position, command_type in enumerate(chain):
+        prefix = get_command_meta(command_type).name
+        if position:
+            args.append(prefix)
+        args.append("value")
+        for index in range(1, shape.parameters):
+            if index % 3 == 0:
+                args.append(f"--{prefix}-{index}")
+            else:
+                args.extend([f"--{prefix}-{index}", "value"])
+    return args
+
+
+def per_call(func: Callable, min_time: float = 0.2) -> float:
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time or calls < 3:
+        func()
+        calls += 1
+    return elapsed / calls
+
+
+def bench_shape(shape: TreeShape) -> dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    entry = make_tree(shape)
+    define = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for command_type in walk(entry):
+        compile_command_type(command_type)
+    compile_ = time.perf_counter() - start
+    _, define_compile_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    chain = leaf_chain(entry)
+    args = chain_args(chain, shape)
+    app = App(entry)
+    app.parse(args)
+
+    instantiate = per_call(lambda: [command(context=None) for command in chain])
+    parse = per_call(lambda: app.parse(args))
+    # Uncached, as for the first --help of the entry command
+    render_help_ = per_call(lambda: render_help(entry))
+
+    gc.collect()
+    tracemalloc.start()
+    results = [app.parse(args) for _ in range(100)]
+    _, parse_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    return {
+        "define_s": define,
+        "compile_s": compile_,
+        "define_compile_peak_bytes": define_compile_peak,
+        "instantiate_chain_s": instantiate,
+        "parse_s": parse,
+        "parse_100_peak_bytes": parse_peak,
+        "render_help_s": render_help_,
+    }
+
+
+def run(shapes: list[TreeShape], repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for shape in shapes:
+        # Best of several fresh trees, class definition and compilation only
+        # happen once per tree
+        runs = [bench_shape(shape) for _ in range(repeat)]
+        results[shape.name] = {
+            metric: min(run[metric] for run in runs) for metric in runs[0]
+        }
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for shape_name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(shape_name, {}).get(metric)
+            # Timings are much noisier than allocation peaks
+            allowed = memory_tolerance if metric.endswith("_bytes") else tolerance
+            if expected and value > expected * (1 + allowed):
+                regressions.append(
+                    f"{shape_name} {metric}: {value:.6g} vs baseline {expected:.6g}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--shape", action="append", choices=[s.name for s in SHAPES])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", action="store_true", help="write the baseline")
+    parser.add_argument("--compare", action="store_true", help="check the baseline")
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    options = parser.parse_args()
+
+    shapes = [s for s in SHAPES if not options.shape or s.name in options.shape]
+    results = run(shapes, options.repeat)
+
+    for shape_name, metrics in results.items():
+        print(shape_name)
+        for metric, value in metrics.items():
+            print(f"    {metric:28} {value:.6g}")
+
+    if options.save:
+        options.baseline.write_text(json.dumps(results, indent=4) + "\n")
+
+    if options.compare:
+        baseline = json.loads(options.baseline.read_text())
+        if regressions := compare(
+            results, baseline, options.tolerance, options.memory_tolerance
+        ):
+            print("Regressions:", *regressions, sep="\n    ")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compares the generic Parser with the code generated for a command, parsing
+the same argument vectors in a tight loop.
+
+    python benchmarks/codegen.py            print both timings and the speedup
+    python benchmarks/codegen.py --check    fail if generated code isn't faster
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heated.codegen import specialized_parser  # noqa: E402
+from heated.command import Command  # noqa: E402
+from heated.compiler import compile_command  # noqa: E402
+from heated.parameters import Argument, Flag, Option, Parameters  # noqa: E402
+from heated.parser import Parser  # noqa: E402
+
+
+def make_command(option_count: int) -> type:
+    namespace = {
+        "__annotations__": {"source": str, "target": str, "verbose": int},
+        "source": Argument("SOURCE"),
+        "target": Argument("TARGET"),
+        "verbose": Flag("-v", action="count"),
+    }
+    for index in range(option_count):
+        if index % 3:
+            namespace[f"option_{index}"] = Option(f"--option-{index}")
+            namespace["__annotations__"][f"option_{index}"] = int
+        else:
+            namespace[f"option_{index}"] = Flag(f"--flag-{index}")
+            namespace["__annotations__"][f"option_{index}"] = bool
+    params = type("Params", (Parameters,), namespace)
+    return type("Main", (Command,), {"__annotations__": {"params": params}})
+
+
+def make_args(option_count: int) -> list[str]:
+    args = ["-v", "source.txt"]
+    for index in range(0, option_count, max(1, option_count // 8)):
+        if index % 3:
+            args.extend([f"--option-{index}", str(index)])
+        else:
+            args.append(f"--flag-{index}")
+    return args + ["target.txt", "-v"]
+
+
+def per_call(command_type: type, args: list[str], parse_args, min_time: float):
+    compiled = compile_command(command_type(context=None))
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time or calls < 3:
+        parse_args(compiled, args)
+        calls += 1
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--min-time", type=float, default=0.3)
+    options = parser.parse_args()
+
+    slower = []
+    for option_count in [4, 32, 256]:
+        command_type = make_command(option_count)
+        compiled = compile_command(command_type(context=None))
+        specialized = specialized_parser(command_type, compiled)
+        args = make_args(option_count)
+
+        generic_time = per_call(command_type, args, Parser.parse_args, options.min_time)
+        specialized_time = per_call(command_type, args, specialized, options.min_time)
+        speedup = generic_time / specialized_time
+        print(
+            f"{option_count:4} options {len(args):3} args  "
+            f"generic {generic_time * 1e6:8.2f} us  "
+            f"generated {specialized_time * 1e6:8.2f} us  "
+            f"{speedup:5.2f}x"
+        )
+        if speedup < 1:
+            slower.append(option_count)
+
+    if options.check and slower:
+        print(f"Generated parser slower with {slower} options")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
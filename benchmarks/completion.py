@@ -0,0 +1,92 @@
+"""Measures shell completion latency the way the shell glue runs it: a fresh
+heated/complete.py process per query, against a bare interpreter start.
+
+    python benchmarks/completion.py            print the timings
+    python benchmarks/completion.py --check    fail if a query adds > 10ms
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import heated.complete  # noqa: E402
+from heated.command import Command  # noqa: E402
+from heated.completion import write_completion_index  # noqa: E402
+from heated.parameters import Option, Parameters  # noqa: E402
+
+
+def make_tree(width: int, options: int) -> type:
+    subcommands = {}
+    for index in range(width):
+        params = type(
+            f"Params{index}",
+            (Parameters,),
+            {
+                "__annotations__": {f"option_{n}": str for n in range(options)},
+                **{f"option_{n}": Option(f"--option-{n}") for n in range(options)},
+            },
+        )
+        subcommands[f"sub_{index}"] = type(
+            f"Sub{index}", (Command,), {"__annotations__": {"params": params}}
+        )
+    return type("Large", (Command,), {"__annotations__": subcommands})
+
+
+def wall_time(args: list[str], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, capture_output=True, cwd=ROOT)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--subcommands", type=int, default=500)
+    parser.add_argument("--options", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--budget", type=float, default=0.010)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = Path(directory) / "index.bin"
+        tree = make_tree(options.subcommands, options.options)
+        write_completion_index(tree, index_path)
+
+        # Same interpreter flags as the generated shell glue
+        bare = wall_time([sys.executable, "-S", "-E", "-c", "pass"], options.runs)
+        query = wall_time(
+            [
+                sys.executable,
+                "-S",
+                "-E",
+                heated.complete.__file__,
+                str(index_path),
+                "bash",
+                f"sub{options.subcommands - 1}",
+                "--option-1",
+            ],
+            options.runs,
+        )
+
+    overhead = query - bare
+    print(f"bare interpreter   {bare * 1000:8.2f} ms")
+    print(f"completion query   {query * 1000:8.2f} ms")
+    print(f"added by heated    {overhead * 1000:8.2f} ms")
+
+    if options.check and overhead > options.budget:
+        print(f"Completion adds more than {options.budget * 1000:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Checks that parsing stays linear in the number of arguments, however many
+options a command defines.
+
+    python benchmarks/option_lookup.py            print the per-token cost
+    python benchmarks/option_lookup.py --check    fail if it grows with options
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heated.command import Command  # noqa: E402
+from heated.compiler import compile_command  # noqa: E402
+from heated.parameters import Option, Parameters  # noqa: E402
+from heated.parser import Parser  # noqa: E402
+
+
+OPTION_COUNTS = [10, 100, 1000, 10000]
+ARGV_LENGTHS = [100, 1000, 10000]
+
+
+def make_command(option_count: int) -> type:
+    namespace = {"__annotations__": {}}
+    for index in range(option_count):
+        namespace[f"option_{index}"] = Option(f"--option-{index}")
+        namespace["__annotations__"][f"option_{index}"] = str
+    params = type("Params", (Parameters,), namespace)
+    return type("Main", (Command,), {"__annotations__": {"params": params}})
+
+
+def make_args(option_count: int, length: int) -> list[str]:
+    # Exact names and --name=value, spread over all options
+    args = []
+    for index in range(length):
+        option = (index * 7919) % option_count
+        if index % 2:
+            args.append(f"--option-{option}=value")
+        else:
+            args.extend([f"--option-{option}", "value"])
+    return args[:length]
+
+
+def per_token(command_type: type, args: list[str], min_time: float = 0.2) -> float:
+    command = command_type(context=None)
+    compiled = compile_command(command)
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time or calls < 3:
+        Parser.parse_args(compiled, args)
+        calls += 1
+    return elapsed / calls / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    options = parser.parse_args()
+
+    results = {}
+    for option_count in OPTION_COUNTS:
+        command_type = make_command(option_count)
+        for length in ARGV_LENGTHS:
+            args = make_args(option_count, length)
+            results[option_count, length] = per_token(command_type, args)
+            print(
+                f"{option_count:6} options {length:6} args "
+                f"{results[option_count, length] * 1e9:10.1f} ns/arg"
+            )
+
+    if options.check:
+        smallest = min(results.values())
+        worst = max(results.values())
+        if worst > smallest * options.max_ratio:
+            print(f"Per argument cost grew {worst / smallest:.1f}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
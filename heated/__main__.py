@@ -0,0 +1,32 @@
+from .app import App
+from .command import Command
+from .freeze import load_entry, write_frozen_module
+from .parameters import Argument, Option, Parameters
+
+
+class BuildParameters(Parameters):
+    entry: str = Argument("ENTRY", help="module:Command or module:app to freeze")
+    output: str = Option(
+        "--output", "-o", default="frozen_cli.py", help="Module to write"
+    )
+
+
+class Build(Command):
+    """Freeze the grammar of a command line into a standalone module."""
+
+    params: BuildParameters
+
+    def invoke(self):
+        write_frozen_module(load_entry(self.params.entry), self.params.output)
+
+
+class Heated(Command):
+    build: Build
+
+
+def main():
+    App(Heated).run()
+
+
+if __name__ == "__main__":
+    main()
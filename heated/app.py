@@ -1,10 +1,25 @@
+import asyncio
+import inspect
+import os
 import sys
-from typing import Type
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Optional, Type
 
-from .command import Command
-from .compiler import compile_command
+from .argfiles import expand_response_files
+from .cache import GrammarCache
+from .codegen import specialized_parser
+from .command import Command, get_command_meta, is_async_command
+from .compiler import CompilerCommand, compile_command, compile_command_type
 from .context import Context
+from .fanout import invoke_fan_out, invoke_fan_out_async
+from .help import HelpRequested, help_text
 from .parser import Parser
+from .sources import Sources
+from .timing import NULL_RECORDER, TIMINGS_ENV, PhaseRecorder, format_timings
+
+
+PROFILE_ENV = "HEATED_PROFILE"
+PROFILER_ENV = "HEATED_PROFILER"
 
 
 class RemainingArguments(Exception):
@@ -13,29 +28,216 @@ class RemainingArguments(Exception):
         super().__init__(f"Unconsumed parameters: {remaining_args}")
 
 
+@dataclass
+class ParseResult:
+    args: list[str]
+    commands: list[Command] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
 class App:
-    def __init__(self, entry_command: Type = None, context: Context = None):
+    def __init__(
+        self,
+        entry_command: Type = None,
+        context: Context = None,
+        grammar_cache: GrammarCache = None,
+        timing_hooks: list[Callable[[Context], None]] = None,
+        trace_allocations: bool = False,
+        response_files: bool = False,
+        sources: Sources = None,
+        specialize: bool = False,
+    ):
         self.entry_command = entry_command
         self.context = context or Context()
+        self.grammar_cache = grammar_cache
+        self.timing_hooks = list(timing_hooks or [])
+        # Expand "@path" arguments, "@-" streams the arguments from stdin
+        self.response_files = response_files
+        # Environment variables, and config files when given
+        self.sources = sources or Sources()
+        # Parse with code generated for each command class instead of the
+        # generic Parser
+        self.specialize = specialize
 
-    def run(self):
+        # HEATED_TIMINGS=1 prints a summary to stderr, "alloc" also counts
+        # allocated memory blocks
+        timings_env = os.environ.get(TIMINGS_ENV, "")
+        self.print_timings = timings_env not in ("", "0")
+        self.trace_allocations = trace_allocations or timings_env == "alloc"
+
+    @property
+    def records_timings(self) -> bool:
+        return bool(self.timing_hooks or self.print_timings or self.trace_allocations)
+
+    def recorder(self, context: Context):
+        if not self.records_timings:
+            return NULL_RECORDER
+        return PhaseRecorder(context.timings, self.trace_allocations)
+
+    def parse(self, args: Iterable[str], context: Context = None) -> list[Command]:
         # Instantiate the entry command, passing the context
         # Compile the command
         # Return value will be remaining parsed arguments, next Command
-        # Call the entry Command's invoke method
         # If there's a next Command, loop at Command instantiation
 
-        context = self.context or Context()
+        context = context or Context()
+        recorder = self.recorder(context)
+        commands = []
         next_command = self.entry_command
-        remaining_args = sys.argv[1:]
+        remaining_args = args
+        if self.response_files:
+            remaining_args = expand_response_files(args)
 
         while next_command is not None:
+            name = get_command_meta(next_command).name
+
+            started = recorder.start()
             command: Command = next_command(context=context)
-            compiled_command = compile_command(command)
-            next_command, remaining_args = Parser.parse_args(compiled_command, remaining_args)
-            command.invoke()
+            recorder.stop(name, "instantiate", started)
+
+            started = recorder.start()
+            compiled_command = compile_command(command, self.grammar_cache)
+            recorder.stop(name, "compile", started)
+
+            if compiled_command.sources:
+                self.sources.apply(compiled_command)
+
+            started = recorder.start()
+            if self.specialize:
+                parse_args = specialized_parser(type(command), compiled_command)
+            else:
+                parse_args = Parser.parse_args
+            try:
+                next_command, remaining_args = parse_args(
+                    compiled_command, remaining_args
+                )
+            except HelpRequested:
+                # Rendered for the command being parsed, before it is validated
+                raise HelpRequested(
+                    help_text(type(command), self.grammar_cache)
+                ) from None
+            compiled_command.validate()
+            recorder.stop(name, "parse", started)
+
+            commands.append(command)
 
         if remaining_args:
             raise RemainingArguments(remaining_args)
 
-        sys.exit(context.exit_code)
+        return commands
+
+    def parse_many(self, args_list: Iterable[list[str]]) -> Iterator[ParseResult]:
+        # Every argument vector gets its own context and command instances, the
+        # compiled plans are shared
+        for args in args_list:
+            try:
+                yield ParseResult(args=args, commands=self.parse(args))
+            except Exception as error:
+                yield ParseResult(args=args, error=error)
+
+    def fan_out(self, command: Command) -> Optional[CompilerCommand]:
+        compiled = compile_command_type(type(command), self.grammar_cache)
+        if compiled.fan_out is None:
+            return None
+        return compiled.bind(command)
+
+    def invoke(self, commands: list[Command], context: Context):
+        recorder = self.recorder(context)
+
+        for command in commands:
+            started = recorder.start()
+            if fan_out := self.fan_out(command):
+                invoke_fan_out(command, fan_out, context)
+            else:
+                command.invoke()
+            recorder.stop(get_command_meta(command).name, "invoke", started)
+
+    async def invoke_async(self, commands: list[Command], context: Context):
+        # One event loop for the whole chain, resources entered by any command
+        # stay open until the last one is done
+        recorder = self.recorder(context)
+
+        try:
+            for command in commands:
+                started = recorder.start()
+                if (fan_out := self.fan_out(command)) and is_async_command(command):
+                    await invoke_fan_out_async(command, fan_out, context)
+                elif fan_out:
+                    invoke_fan_out(command, fan_out, context)
+                elif inspect.isawaitable(result := command.invoke()):
+                    await result
+                recorder.stop(get_command_meta(command).name, "invoke", started)
+        finally:
+            await context.aclose()
+
+    def execute(self, args: Iterable[str], context: Context = None) -> int:
+        # Parse the whole command chain, then call each Command's invoke method
+        context = context or Context()
+
+        try:
+            commands = self.parse(args, context)
+            if any(is_async_command(command) for command in commands):
+                asyncio.run(self.invoke_async(commands, context))
+            else:
+                self.invoke(commands, context)
+        except HelpRequested as request:
+            sys.stdout.write(request.text)
+        finally:
+            self.report_timings(context)
+
+        if self.grammar_cache is not None:
+            self.grammar_cache.save()
+
+        return context.exit_code
+
+    async def execute_async(self, args: Iterable[str], context: Context = None) -> int:
+        context = context or Context()
+
+        try:
+            commands = self.parse(args, context)
+            await self.invoke_async(commands, context)
+        except HelpRequested as request:
+            sys.stdout.write(request.text)
+        finally:
+            self.report_timings(context)
+
+        if self.grammar_cache is not None:
+            self.grammar_cache.save()
+
+        return context.exit_code
+
+    def report_timings(self, context: Context):
+        for hook in self.timing_hooks:
+            hook(context)
+
+        if self.print_timings:
+            print(format_timings(context.timings), file=sys.stderr)
+
+    def run(self):
+        if profile_path := os.environ.get(PROFILE_ENV):
+            # Only imported when profiling so normal runs don't pay for it
+            from .profiling import run_profiled
+
+            exit_code = run_profiled(
+                lambda: self.execute(sys.argv[1:], self.context),
+                profile_path,
+                os.environ.get(PROFILER_ENV, "cprofile"),
+            )
+        else:
+            exit_code = self.execute(sys.argv[1:], self.context)
+
+        sys.exit(exit_code)
+
+    async def run_async(self):
+        if profile_path := os.environ.get(PROFILE_ENV):
+            from .profiling import run_profiled_async
+
+            exit_code = await run_profiled_async(
+                lambda: self.execute_async(sys.argv[1:], self.context),
+                profile_path,
+                os.environ.get(PROFILER_ENV, "cprofile"),
+            )
+        else:
+            exit_code = await self.execute_async(sys.argv[1:], self.context)
+
+        sys.exit(exit_code)
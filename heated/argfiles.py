@@ -0,0 +1,72 @@
+import os
+import sys
+from typing import Iterable, Iterator, TextIO, Union
+
+
+RESPONSE_PREFIX = "@"
+# "@-" reads the arguments from stdin
+STDIN_NAME = "-"
+CHUNK_SIZE = 1 << 16
+
+
+class ResponseFileError(Exception):
+    def __init__(self, path: str, message: str = None):
+        self.path = path
+        if not message:
+            message = f"Response file {path} includes itself"
+        super().__init__(message)
+
+
+def read_arguments(stream: TextIO, separator: str = "\n") -> Iterator[str]:
+    # One argument per line, or per separator such as "\0" for find -print0.
+    # Read lazily so the whole list is never in memory at once
+    if separator == "\n":
+        for line in stream:
+            if argument := line.rstrip("\r\n"):
+                yield argument
+        return
+
+    rest = ""
+    while chunk := stream.read(CHUNK_SIZE):
+        *arguments, rest = (rest + chunk).split(separator)
+        yield from filter(None, arguments)
+    if rest:
+        yield rest
+
+
+def _read_response_file(path: str, separator: str) -> Iterator[str]:
+    if path == STDIN_NAME:
+        yield from read_arguments(sys.stdin, separator)
+        return
+
+    with open(path, encoding="utf-8") as f:
+        yield from read_arguments(f, separator)
+
+
+def expand_response_files(
+    args: Iterable[str],
+    separator: str = "\n",
+    _active: frozenset[str] = frozenset(),
+) -> Iterator[str]:
+    # Replaces every "@path" argument with the arguments in the file, response
+    # files may name other response files
+    for arg in args:
+        if not arg.startswith(RESPONSE_PREFIX) or len(arg) == 1:
+            yield arg
+            continue
+
+        path = arg[1:]
+        key = path if path == STDIN_NAME else os.path.realpath(path)
+        if key in _active:
+            raise ResponseFileError(path)
+
+        yield from expand_response_files(
+            _read_response_file(path, separator), separator, _active | {key}
+        )
+
+
+def open_arguments(
+    path: Union[str, os.PathLike], separator: str = "\n"
+) -> Iterator[str]:
+    # Streams the arguments of a file, "-" for stdin
+    return _read_response_file(os.fspath(path), separator)
@@ -0,0 +1,153 @@
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Optional, Type, Union
+
+from .command import LazyCommand, get_command_meta, is_command
+from .compiler import CompilerCommand
+from .parameters import is_parameters, resolve_param_meta
+
+
+CACHE_VERSION = 1
+
+Fingerprint = tuple[tuple[str, int, int], ...]
+
+
+def type_key(type_: Type) -> str:
+    return f"{type_.__module__}:{type_.__qualname__}"
+
+
+def help_key(type_: Type) -> str:
+    return f"{type_key(type_)}#help"
+
+
+# Modules whose classes end up in the pickled plans, or that decide what a
+# plan contains
+HEATED_MODULES = {
+    __name__,
+    "heated.command",
+    "heated.compiler",
+    "heated.converters",
+    "heated.help",
+    "heated.parameters",
+    "heated.suggest",
+}
+
+
+def _parameters_types(parameters_type: Type) -> list[Type]:
+    # Inherited definitions are part of the plan, so base classes count too
+    result = [mro_cls for mro_cls in parameters_type.__mro__ if is_parameters(mro_cls)]
+    for child_type in resolve_param_meta(parameters_type).child_parameters.values():
+        result.extend(_parameters_types(child_type))
+    return result
+
+
+def source_modules(command_type: Type) -> set[str]:
+    meta = get_command_meta(command_type)
+    types = [mro_cls for mro_cls in command_type.__mro__ if is_command(mro_cls)]
+    types.extend(
+        subcommand
+        for subcommand in meta.subcommands.values()
+        if not isinstance(subcommand, LazyCommand)
+    )
+    for parameters_type in meta.parameters.values():
+        types.extend(_parameters_types(parameters_type))
+
+    # Changes to heated itself invalidate every entry
+    return {type_.__module__ for type_ in types} | HEATED_MODULES
+
+
+def fingerprint(command_type: Type) -> Optional[Fingerprint]:
+    result = []
+    for module_name in sorted(source_modules(command_type)):
+        filename = getattr(sys.modules.get(module_name), "__file__", None)
+        if not filename:
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        result.append((filename, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(result)
+
+
+class GrammarCache:
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+        self._entries: Optional[dict[str, tuple[Fingerprint, bytes]]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> dict[str, tuple[Fingerprint, bytes]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> dict[str, tuple[Fingerprint, bytes]]:
+        try:
+            with open(self.path, "rb") as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return {}
+
+        if version != CACHE_VERSION:
+            return {}
+        return entries
+
+    def _get_data(self, key: str, command_type: Type) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        saved_fingerprint, data = entry
+        if saved_fingerprint != fingerprint(command_type):
+            return None
+        return data
+
+    def _put_data(self, key: str, command_type: Type, data: bytes):
+        current_fingerprint = fingerprint(command_type)
+        if current_fingerprint is None:
+            return
+
+        self.entries[key] = (current_fingerprint, data)
+        self._dirty = True
+
+    def get(self, command_type: Type) -> Optional[CompilerCommand]:
+        data = self._get_data(type_key(command_type), command_type)
+        if data is None:
+            return None
+
+        try:
+            return pickle.loads(data)
+        except Exception:
+            return None
+
+    def put(self, command_type: Type, compiled: CompilerCommand):
+        try:
+            data = pickle.dumps(compiled, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            # Locally defined classes can't be referenced from a cache file
+            return
+
+        self._put_data(type_key(command_type), command_type, data)
+
+    def get_help(self, command_type: Type) -> Optional[str]:
+        # Rendered help is kept next to the plan, with the same fingerprint
+        data = self._get_data(help_key(command_type), command_type)
+        return None if data is None else data.decode("utf-8")
+
+    def put_help(self, command_type: Type, text: str):
+        self._put_data(help_key(command_type), command_type, text.encode("utf-8"))
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump((CACHE_VERSION, self.entries), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        self._dirty = False
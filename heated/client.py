@@ -0,0 +1,49 @@
+# Client for heated.daemon, kept free of heated imports so it starts quickly
+import json
+import os
+import socket
+import sys
+from typing import TextIO
+
+
+def run_client(
+    socket_path: str,
+    args: list[str],
+    env: dict[str, str] = None,
+    cwd: str = None,
+    stdout: TextIO = None,
+    stderr: TextIO = None,
+) -> int:
+    streams = {"stdout": stdout or sys.stdout, "stderr": stderr or sys.stderr}
+    request = {
+        "args": args,
+        "env": dict(os.environ) if env is None else env,
+        "cwd": cwd or os.getcwd(),
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(request).encode() + b"\n")
+
+        with connection.makefile("r", encoding="utf-8") as responses:
+            for line in responses:
+                response = json.loads(line)
+                if "exit_code" in response:
+                    return response["exit_code"]
+                stream = streams[response["stream"]]
+                stream.write(response["data"])
+                stream.flush()
+
+    raise ConnectionError("Daemon closed the connection without an exit code")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.stderr.write("usage: python -m heated.client SOCKET [ARGS...]\n")
+        sys.exit(2)
+
+    sys.exit(run_client(sys.argv[1], sys.argv[2:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from typing import Any, Callable, Iterable, Optional, Type
+
+from .compiler import (
+    CompilerAction,
+    CompilerArgument,
+    CompilerCommand,
+    CompilerCount,
+    CompilerStore,
+    CompilerStoreBool,
+)
+from .parser import Parser
+
+
+SPECIALIZEDCACHE = "_specialized_parser_"
+
+SpecializedParser = Callable[
+    [CompilerCommand, Iterable[str]], tuple[Optional[Type], Iterable[str]]
+]
+
+
+class _Source:
+    def __init__(self):
+        self.lines: list[str] = []
+        self.namespace: dict[str, Any] = {}
+
+    def add(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    def constant(self, prefix: str, value: Any) -> str:
+        name = f"{prefix}{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+
+def _action_lines(
+    source: _Source, action: CompilerAction, value: str, tracked: bool
+) -> list[str]:
+    # Straight-line code for one action, the owners are locals o0, o1, ...
+    lines = [f"seen |= {action.mask}"] if tracked else []
+    return lines + _store_lines(source, action, value)
+
+
+def _store_lines(source: _Source, action: CompilerAction, value: str) -> list[str]:
+    if isinstance(action, CompilerStore):
+        convert = source.constant("convert", action.convert)
+        return [f"o{action.owner}.{action.member_name} = {convert}({value})"]
+    if isinstance(action, CompilerStoreBool):
+        return [f"o{action.owner}.{action.member_name} = {action.value!r}"]
+    if isinstance(action, CompilerCount):
+        target = f"o{action.owner}.{action.member_name}"
+        return [f"{target} = ({target} or 0) + 1"]
+
+    # Anything else goes through the action itself
+    set_ = source.constant("set", action.set)
+    if action.takes_value:
+        return [f"{set_}(owners, {value})"]
+    return [f"{set_}(owners)"]
+
+
+def _dispatch(source: _Source, bodies: list[list[str]], start: int, indent: int):
+    # Binary search over the option index, O(log n) comparisons per option
+    if len(bodies) == 1:
+        for line in bodies[0]:
+            source.add(indent, line)
+        return
+
+    middle = len(bodies) // 2
+    source.add(indent, f"if index < {start + middle}:")
+    _dispatch(source, bodies[:middle], start, indent + 1)
+    source.add(indent, "else:")
+    _dispatch(source, bodies[middle:], start + middle, indent + 1)
+
+
+def generate_parser_source(compiled: CompilerCommand) -> tuple[str, dict[str, Any]]:
+    # Handles exact option names and single positional values inline, any other
+    # argument hands over to the generic Parser at that point
+    source = _Source()
+    tracked = bool(compiled.validated or compiled.constraints)
+
+    # Aliases of an option share its index
+    option_index = {}
+    indexes = {}
+    bodies = []
+    for name, option in compiled.options.items():
+        if isinstance(option.child, CompilerArgument):
+            continue
+        if id(option) not in indexes:
+            indexes[id(option)] = len(bodies)
+            bodies.append(
+                _action_lines(source, option.child, "next(it, None)", tracked)
+            )
+        option_index[name] = indexes[id(option)]
+
+    positionals = []
+    for argument in compiled.arguments:
+        if argument.repeats or argument.nargs not in (None, "?"):
+            break
+        positionals.append(_action_lines(source, argument.action, "arg", tracked))
+
+    options = source.constant("options", option_index)
+    subcommands = source.constant("subcommands", frozenset(compiled.subcommands))
+    source.namespace["resume"] = Parser.resume
+
+    source.add(0, "def parse(compiled, args):")
+    source.add(1, "owners = compiled.owners")
+    if tracked:
+        source.add(1, "seen = compiled.seen")
+    for owner in range(len(compiled.owner_paths)):
+        source.add(1, f"o{owner} = owners[{owner}]")
+    source.add(1, "streamed = not isinstance(args, (list, tuple))")
+    source.add(1, "it = iter(args)")
+    source.add(1, "position = 0")
+    source.add(1, "for arg in it:")
+    if compiled.subcommands:
+        source.add(2, f"if not arg or arg in {subcommands}:")
+    else:
+        source.add(2, "if not arg:")
+    source.add(3, "break")
+    if bodies:
+        source.add(2, f"index = {options}.get(arg)")
+        source.add(2, "if index is not None:")
+        _dispatch(source, bodies, 0, 3)
+        source.add(3, "continue")
+    source.add(2, f'if arg[0] == "-" or position >= {len(positionals)}:')
+    source.add(3, "break")
+    for position, lines in enumerate(positionals):
+        source.add(2, f"{'if' if position == 0 else 'elif'} position == {position}:")
+        for line in lines:
+            source.add(3, line)
+    source.add(2, "position += 1")
+    source.add(1, "else:")
+    if tracked:
+        source.add(2, "compiled.seen = seen")
+    source.add(2, "return None, []")
+    if tracked:
+        source.add(1, "compiled.seen = seen")
+    source.add(1, "return resume(compiled, it, arg, position, streamed)")
+
+    return "\n".join(source.lines) + "\n", source.namespace
+
+
+def specialize(compiled: CompilerCommand) -> SpecializedParser:
+    text, namespace = generate_parser_source(compiled)
+    exec(compile(text, "<heated specialized parser>", "exec"), namespace)
+    return namespace["parse"]
+
+
+def specialized_parser(
+    command_type: Type, compiled: CompilerCommand
+) -> SpecializedParser:
+    # Generated once per command class, like the compiled plan
+    if parser := vars(command_type).get(SPECIALIZEDCACHE):
+        return parser
+
+    parser = specialize(compiled)
+    setattr(command_type, SPECIALIZEDCACHE, parser)
+    return parser
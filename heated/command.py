@@ -1,5 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+import importlib
+import inspect
 from typing import Any, Type, Union, get_type_hints
 
 from heated.context import Context
@@ -17,6 +19,25 @@ class CommandMeta:
     subcommands: dict[str, Type] = field(default_factory=dict)
 
 
+class LazyCommand:
+    def __init__(self, path: str, name: str = None, help: str = ""):
+        module_name, _, qualname = path.partition(":")
+        if not module_name or not qualname:
+            raise ValueError(f"Expected 'module:ClassName' for a lazy command: {path}")
+
+        self.path = path
+        self.name = name or qualname.rpartition(".")[2].lower().replace("_", "-")
+        # Summary in the parent's help, so listing it doesn't import the module
+        self.help = help
+
+    def load(self) -> Type:
+        module_name, _, qualname = self.path.partition(":")
+        command = importlib.import_module(module_name)
+        for attr_name in qualname.split("."):
+            command = getattr(command, attr_name)
+        return command
+
+
 class Command:
     def __init__(self, context: Context):
         self.context = context
@@ -31,6 +52,7 @@ class Command:
         parameters = {}
         subcommands = {}
 
+        # Annotations of the whole MRO, so inherited declarations are included
         annotations = get_type_hints(cls)
 
         for attr_name, type_ in annotations.items():
@@ -41,24 +63,20 @@ class Command:
             elif is_parameters(type_):
                 parameters[attr_name] = type_
 
+        # Lazy subcommands are declared as class attributes so their module is
+        # only imported once the subcommand is selected
+        for mro_cls in reversed(cls.__mro__):
+            for attr_name, value in vars(mro_cls).items():
+                if isinstance(value, LazyCommand):
+                    subcommands[attr_name] = value
+
         meta = CommandMeta(name, parameters, subcommands)
         setattr(cls, COMMANDMETA, meta)
 
     def __new__(cls, *args, **kwargs):
         instance = super().__new__(cls)
 
-        meta = get_command_meta(cls)
-
-        parameters = {}
-        subcommands = {}
-        for mro_cls in reversed(cls.__mro__):
-            if not is_command(mro_cls):
-                continue
-            mro_meta = get_command_meta(mro_cls)
-            parameters.update(mro_meta.parameters)
-            subcommands.update(mro_meta.subcommands)
-
-        for param_name, param_cls in meta.parameters.items():
+        for param_name, param_cls in get_command_meta(cls).parameters.items():
             setattr(instance, param_name, param_cls())
 
         return instance
@@ -72,6 +90,22 @@ def get_command_meta(command: Union[Command, Type]) -> CommandMeta:
     return getattr(command, COMMANDMETA)
 
 
+def is_async_command(command: Union[Command, Type]) -> bool:
+    return inspect.iscoroutinefunction(command.invoke)
+
+
+def get_command_name(command: Union[Command, Type, LazyCommand]) -> str:
+    if isinstance(command, LazyCommand):
+        return command.name
+    return get_command_meta(command).name
+
+
+def load_command(command: Union[Type, LazyCommand]) -> Type:
+    if isinstance(command, LazyCommand):
+        return command.load()
+    return command
+
+
 def get_parameter_instances(command: Command) -> dict[str, Parameters]:
     meta = get_command_meta(command)
 
@@ -1,14 +1,27 @@
-from dataclasses import dataclass
-from typing import Any, Type, Union
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Type, Union, get_args, get_origin
 
-from .command import Command, get_command_meta, get_parameter_instances
+from .command import Command, get_command_meta, get_command_name
+from .converters import convert_bool, get_converter
+from .help import HELP_OPTIONS, HelpRequested
 from .parameters import (
     Argument,
+    AtLeastOne,
+    Exclusive,
     Flag,
     FlatParameter,
     Option,
-    flatten_parameters,
+    ParameterGroup,
+    Required,
+    flatten_parameter_types,
+    get_param_meta,
+    resolve_param_meta,
 )
+from .suggest import NgramIndex
+
+
+COMPILERCACHE = "_compiled_command_"
 
 
 class ParameterCollisionError(Exception):
@@ -19,96 +32,612 @@ class ParameterCollisionError(Exception):
         super().__init__(message)
 
 
+class AmbiguousOptionError(Exception):
+    def __init__(self, option: str, candidates: list[str], message: str = None):
+        self.option = option
+        self.candidates = candidates
+        if not message:
+            message = f"Ambiguous option {option}, could be: {', '.join(candidates)}"
+        super().__init__(message)
+
+
+class ParameterGroupError(Exception):
+    def __init__(self, names: list[str], message: str = None):
+        self.names = names
+        if not message:
+            message = f"Parameters can't be used together: {', '.join(names)}"
+        super().__init__(message)
+
+
 class CompilerAction:
-    def set(self, value: Any):
+    takes_value = False
+    # Bit of the parameter in CompilerCommand.seen, set by compile_groups
+    mask = 0
+
+    def set(self, owners: list[Any], value: Any):
         raise NotImplementedError
 
 
+class ConvertingAction(CompilerAction):
+    # The converter for type_ is resolved once per plan, it isn't pickled with
+    # the plan but resolved again when the plan is loaded
+    type_: Type
+    convert: Callable[[str], Any]
+
+    def __post_init__(self):
+        self.convert = get_converter(self.type_)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = dict(vars(self))
+        del state["convert"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        vars(self).update(state)
+        self.__post_init__()
+
+
 @dataclass
-class CompilerStore(CompilerAction):
+class CompilerStore(ConvertingAction):
     type_: Type
-    owner: Any
+    owner: int
     member_name: str
+    convert: Callable[[str], Any] = field(init=False, repr=False, compare=False)
 
-    def set(self, value: Any):
-        setattr(self.owner, self.member_name, self.type_(value))
+    takes_value = True
+
+    def set(self, owners: list[Any], value: Any):
+        setattr(owners[self.owner], self.member_name, self.convert(value))
 
 
 @dataclass
 class CompilerStoreBool(CompilerAction):
-    owner: Any
+    owner: int
     member_name: str
     value: bool = True
 
-    def set(self):
-        setattr(self.owner, self.member_name, self.value)
+    def set(self, owners: list[Any]):
+        setattr(owners[self.owner], self.member_name, self.value)
+
+
+@dataclass
+class CompilerAppend(ConvertingAction):
+    type_: Type
+    owner: int
+    member_name: str
+    default: Any = None
+    # Accumulate into an array.array of this type code instead of a list
+    typecode: Optional[str] = None
+    convert: Callable[[str], Any] = field(init=False, repr=False, compare=False)
+
+    takes_value = True
+
+    def values(self, owner: Any) -> Any:
+        values = getattr(owner, self.member_name)
+        # Never add to the shared default
+        if values is None or values is self.default:
+            values = array(self.typecode) if self.typecode else []
+            setattr(owner, self.member_name, values)
+        return values
+
+    def set(self, owners: list[Any], value: Any):
+        self.values(owners[self.owner]).append(self.convert(value))
+
+    def extend(self, owners: list[Any], values: list[str]):
+        # Converted in bulk, map and array.extend both loop in C
+        self.values(owners[self.owner]).extend(map(self.convert, values))
+
+
+@dataclass
+class CompilerExtend(CompilerAppend):
+    def set(self, owners: list[Any], value: Any):
+        self.extend(owners, value.split(","))
+
+
+@dataclass
+class CompilerCount(CompilerAction):
+    owner: int
+    member_name: str
+
+    def set(self, owners: list[Any]):
+        owner = owners[self.owner]
+        setattr(owner, self.member_name, (getattr(owner, self.member_name) or 0) + 1)
+
+
+@dataclass
+class CompilerHelp(CompilerAction):
+    def set(self, owners: list[Any]):
+        raise HelpRequested()
 
 
 @dataclass
 class CompilerArgument:
     action: CompilerAction
+    # Consumes every remaining positional value
+    repeats: bool = False
+    fan_out: bool = False
+    # Consecutive values taken at once: a count, "*" or "+"
+    nargs: Union[int, str, None] = None
+
+
+@dataclass
+class SourceBinding:
+    # Where a parameter's value comes from when it isn't on the command line
+    action: CompilerAction
+    env: Optional[str] = None
+    config: Optional[tuple[str, ...]] = None
+
+    def apply(self, owners: list[Any], value: Any):
+        # Environment values are strings, config values may already be typed
+        action = self.action
+        if not action.takes_value:
+            # Flags take a boolean, counted flags a number
+            if isinstance(value, str) and isinstance(action, CompilerStoreBool):
+                value = convert_bool(value)
+            elif isinstance(value, str):
+                value = int(value)
+            setattr(owners[action.owner], action.member_name, value)
+        elif isinstance(value, str):
+            action.set(owners, value)
+        elif isinstance(action, CompilerAppend) and isinstance(value, (list, tuple)):
+            for item in value:
+                self.apply_one(owners, item)
+        else:
+            self.apply_one(owners, value)
+
+    def apply_one(self, owners: list[Any], value: Any):
+        action = self.action
+        if not isinstance(action.type_, type) or not isinstance(value, action.type_):
+            action.set(owners, str(value))
+        elif isinstance(action, CompilerAppend):
+            action.values(owners[action.owner]).append(value)
+        else:
+            setattr(owners[action.owner], action.member_name, value)
 
 
 @dataclass
 class CompilerOption:
     child: Union[CompilerAction, CompilerArgument]
 
+    @property
+    def takes_value(self) -> bool:
+        if isinstance(self.child, CompilerArgument):
+            return self.child.action.takes_value
+        return self.child.takes_value
+
+
+class _TrieNode:
+    __slots__ = ("children", "option", "unique")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.option: Optional[CompilerOption] = None
+        # The only option below this node, None when there are several
+        self.unique: Optional[CompilerOption] = None
+
+
+class OptionTrie:
+    def __init__(self, options: dict[str, CompilerOption] = None):
+        self.root = _TrieNode()
+        for name, option in (options or {}).items():
+            self.insert(name, option)
+
+    def insert(self, name: str, option: CompilerOption):
+        node = self.root
+        for char in name:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+                child.unique = option
+            elif child.unique is not option:
+                child.unique = None
+            node = child
+        node.option = option
+
+    def names(self, prefix: str) -> list[str]:
+        node = self.root
+        for char in prefix:
+            if (node := node.children.get(char)) is None:
+                return []
+
+        result = []
+        stack = [(prefix, node)]
+        while stack:
+            name, node = stack.pop()
+            if node.option is not None:
+                result.append(name)
+            stack.extend((name + char, child) for char, child in node.children.items())
+        return sorted(result)
+
+    def match(self, arg: str) -> tuple[Optional[CompilerOption], int]:
+        # Walks the option name up to an "=" once, returns the option for the
+        # exact name or an unambiguous prefix of it, and where the name ends
+        node = self.root
+        end = len(arg)
+        for index, char in enumerate(arg):
+            if char == "=":
+                end = index
+                break
+            if (node := node.children.get(char)) is None:
+                return None, index
+
+        # A bare "--" prefix (as in "--=value") names no option
+        if node is self.root or end <= 2:
+            return None, end
+        if node.option is not None:
+            return node.option, end
+        if node.unique is not None:
+            return node.unique, end
+
+        raise AmbiguousOptionError(arg[:end], self.names(arg[:end]))
+
+
+@dataclass
+class CompilerConstraint:
+    mask: int
+    # Display name of each parameter bit, for the error message
+    names: dict[int, str]
+
+    def describe(self, mask: int) -> list[str]:
+        return [name for bit, name in self.names.items() if bit & mask]
+
+    def check(self, seen: int):
+        raise NotImplementedError
+
+
+class CompilerExclusive(CompilerConstraint):
+    def check(self, seen: int):
+        # More than one bit set
+        hits = seen & self.mask
+        if hits & (hits - 1):
+            raise ParameterGroupError(self.describe(hits))
+
+
+class CompilerRequired(CompilerConstraint):
+    def check(self, seen: int):
+        if (hits := seen & self.mask) != self.mask:
+            missing = self.describe(self.mask & ~hits)
+            raise ParameterGroupError(
+                missing, f"Missing required parameters: {', '.join(missing)}"
+            )
+
+
+class CompilerAtLeastOne(CompilerConstraint):
+    def check(self, seen: int):
+        if not seen & self.mask:
+            names = self.describe(self.mask)
+            raise ParameterGroupError(
+                names, f"One of these parameters is required: {', '.join(names)}"
+            )
+
+
+CONSTRAINTS: dict[Type[ParameterGroup], Type[CompilerConstraint]] = {
+    Exclusive: CompilerExclusive,
+    Required: CompilerRequired,
+    AtLeastOne: CompilerAtLeastOne,
+}
+
 
 @dataclass
 class CompilerCommand:
     options: dict[str, CompilerOption]
     arguments: list[CompilerArgument]
     subcommands: dict[str, Command]
+    # Long options only, for abbreviations and --option=value
+    option_trie: OptionTrie = field(default_factory=OptionTrie)
+    # Owner index and member name of the fan out argument
+    fan_out: Optional[tuple[int, str]] = None
+    # Attribute paths from the command to each Parameters instance, the actions
+    # refer to these by index
+    owner_paths: list[tuple[str, ...]] = field(default_factory=list)
+    # Parameters bound to environment variables or config keys
+    sources: list[SourceBinding] = field(default_factory=list)
+    # Owner indexes of Parameters instances that declare validators
+    validated: frozenset[int] = frozenset()
+    # Parameter bits of each owner
+    owner_masks: list[int] = field(default_factory=list)
+    constraints: list[CompilerConstraint] = field(default_factory=list)
+    # Bits of the parameters given a value during a single invocation, only
+    # tracked when something is validated or constrained
+    seen: Optional[int] = None
+    # Fuzzy indexes for suggestions, built on the first unknown name and shared
+    # by the bound copies
+    option_names: Optional[NgramIndex] = None
+    command_names: Optional[NgramIndex] = None
+    # Parameters instances of a single invocation, filled in by bind
+    owners: list[Any] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.option_names is None:
+            self.option_names = NgramIndex(self.options)
+        if self.command_names is None:
+            self.command_names = NgramIndex(self.subcommands)
+
+    def bind(self, command: Command) -> "CompilerCommand":
+        owners = []
+        for path in self.owner_paths:
+            owner = command
+            for attr_name in path:
+                owner = getattr(owner, attr_name)
+            owners.append(owner)
+
+        return CompilerCommand(
+            options=self.options,
+            arguments=self.arguments,
+            subcommands=self.subcommands,
+            option_trie=self.option_trie,
+            fan_out=self.fan_out,
+            owner_paths=self.owner_paths,
+            sources=self.sources,
+            validated=self.validated,
+            owner_masks=self.owner_masks,
+            constraints=self.constraints,
+            seen=0 if self.validated or self.constraints else None,
+            option_names=self.option_names,
+            command_names=self.command_names,
+            owners=owners,
+        )
+
+    def validate(self):
+        if self.seen is None:
+            return
+
+        for constraint in self.constraints:
+            constraint.check(self.seen)
+
+        # Only the validators of groups that were given a value run
+        for index in sorted(self.validated):
+            if self.seen & self.owner_masks[index]:
+                owner = self.owners[index]
+                for validator in get_param_meta(owner).validators:
+                    validator(owner)
+
+
+def element_type(annotation: Type) -> Type:
+    # list[int] -> int, anything else is taken as the element type itself
+    if get_origin(annotation) in (list, tuple) and (args := get_args(annotation)):
+        return args[0]
+    return annotation
+
+
+def storage_typecode(annotation: Type, default: Any) -> Optional[str]:
+    # Values annotated as array.array are stored compactly, the type code comes
+    # from an array default and is "q" otherwise
+    if annotation is not array:
+        return None
+    return default.typecode if isinstance(default, array) else "q"
+
+
+def accumulate_action(
+    action_type: Type[CompilerAppend], definition: FlatParameter, owner: int
+) -> CompilerAppend:
+    typecode = storage_typecode(definition.annotation, definition.parameter.default)
+    if typecode is not None:
+        type_ = float if typecode in "fd" else int
+    else:
+        type_ = element_type(definition.annotation)
+
+    return action_type(
+        type_,
+        owner,
+        definition.member_name,
+        definition.parameter.default,
+        typecode,
+    )
 
 
 def compile_parameters(
     definitions: tuple[FlatParameter],
-) -> tuple[list[CompilerArgument], dict[str, CompilerOption]]:
+) -> tuple[list[CompilerArgument], dict[str, CompilerOption], list[Any]]:
     seen_names = set()
 
     arguments = []
     options = {}
+    owners = {}
 
     for definition in definitions:
         if collision := seen_names & set(definition.parameter.names):
             raise ParameterCollisionError(collision)
         seen_names.update(definition.parameter.names)
 
-        if isinstance(definition.parameter, Argument):
-            action = CompilerStore(
-                definition.annotation, definition.owner, definition.member_name
+        owner = owners.setdefault(definition.owner, len(owners))
+        parameter = definition.parameter
+
+        if isinstance(parameter, Argument) and parameter.fan_out:
+            action = accumulate_action(CompilerAppend, definition, owner)
+            argument = CompilerArgument(action=action, repeats=True, fan_out=True)
+            arguments.append(argument)
+        elif isinstance(parameter, Argument) and parameter.nargs not in (None, "?"):
+            action = accumulate_action(CompilerAppend, definition, owner)
+            # "*" and "+" also take the values after later options
+            argument = CompilerArgument(
+                action=action,
+                repeats=parameter.nargs in ("*", "+"),
+                nargs=parameter.nargs,
             )
+            arguments.append(argument)
+        elif isinstance(parameter, Argument):
+            action = CompilerStore(definition.annotation, owner, definition.member_name)
             argument = CompilerArgument(action=action)
             arguments.append(argument)
-        elif isinstance(definition.parameter, Option):
-            action = CompilerStore(
-                definition.annotation, definition.owner, definition.member_name
-            )
+        elif isinstance(parameter, Option):
+            if parameter.action == "append":
+                action = accumulate_action(CompilerAppend, definition, owner)
+            elif parameter.action == "extend":
+                action = accumulate_action(CompilerExtend, definition, owner)
+            else:
+                action = CompilerStore(
+                    definition.annotation, owner, definition.member_name
+                )
             option = CompilerOption(child=action)
-            for name in definition.parameter.names:
+            for name in parameter.names:
                 options[name] = option
-        elif isinstance(definition.parameter, Flag):
-            action = CompilerStoreBool(
-                definition.owner,
-                definition.member_name,
-                not definition.parameter.default,
-            )
+        elif isinstance(parameter, Flag):
+            if parameter.action == "count":
+                action = CompilerCount(owner, definition.member_name)
+            else:
+                action = CompilerStoreBool(
+                    owner,
+                    definition.member_name,
+                    not parameter.default,
+                )
             option = CompilerOption(action)
-            for name in definition.parameter.names:
+            for name in parameter.names:
                 options[name] = option
 
-    return arguments, options
+    return arguments, options, list(owners)
+
+
+def parameter_actions(
+    arguments: list[CompilerArgument], options: dict[str, CompilerOption]
+) -> dict[tuple[int, str], CompilerAction]:
+    # Action of each parameter by owner index and member name
+    return {
+        (action.owner, action.member_name): action
+        for action in [
+            *(argument.action for argument in arguments),
+            *(option.child for option in options.values()),
+        ]
+    }
+
+
+def compile_sources(
+    definitions: tuple[FlatParameter],
+    arguments: list[CompilerArgument],
+    options: dict[str, CompilerOption],
+    owner_paths: list[tuple[str, ...]],
+) -> list[SourceBinding]:
+    actions = parameter_actions(arguments, options)
+
+    sources = []
+    for definition in definitions:
+        parameter = definition.parameter
+        if parameter.env is None and parameter.config is None:
+            continue
+
+        owner = owner_paths.index(definition.owner)
+        sources.append(
+            SourceBinding(
+                actions[owner, definition.member_name],
+                env=parameter.env,
+                config=tuple(parameter.config.split(".")) if parameter.config else None,
+            )
+        )
+    return sources
+
 
+def owner_type(parameters: dict[str, Type], path: tuple[str, ...]) -> Type:
+    attr_name, *child_names = path
+    parameters_type = parameters[attr_name]
+    for child_name in child_names:
+        child_parameters = resolve_param_meta(parameters_type).child_parameters
+        parameters_type = child_parameters[child_name]
+    return parameters_type
 
-def compile_command(command: Command) -> CompilerCommand:
-    command_meta = get_command_meta(command)
+
+def compile_groups(
+    definitions: tuple[FlatParameter],
+    arguments: list[CompilerArgument],
+    options: dict[str, CompilerOption],
+    owner_paths: list[tuple[str, ...]],
+    owner_types: list[Type],
+) -> tuple[list[int], list[CompilerConstraint]]:
+    # Parameters only get a bit when the command validates or constrains them,
+    # the parser doesn't track anything otherwise
+    owner_masks = [0] * len(owner_paths)
+    metas = [get_param_meta(parameters_type) for parameters_type in owner_types]
+    if not any(meta.validators or meta.groups for meta in metas):
+        return owner_masks, []
+
+    actions = parameter_actions(arguments, options)
+    parameters = {}
+    for index, definition in enumerate(definitions):
+        owner = owner_paths.index(definition.owner)
+        action = actions[owner, definition.member_name]
+        action.mask = 1 << index
+        owner_masks[owner] |= action.mask
+        parameters[action.mask] = definition
+
+    constraints = []
+    for owner, meta in enumerate(metas):
+        for group in meta.groups:
+            group_bits = [actions[owner, name].mask for name in group.names]
+            names = {}
+            for bit in group_bits:
+                definition = parameters[bit]
+                names[bit] = max(
+                    definition.parameter.names, key=len, default=definition.member_name
+                )
+            constraints.append(
+                CONSTRAINTS[type(group)](mask=sum(group_bits), names=names)
+            )
+    return owner_masks, constraints
+
+
+def compile_command_type(command_type: Type, cache: Any = None) -> CompilerCommand:
+    # Only look in the class' own namespace, a subclass must not reuse the
+    # plan of its parent
+    if compiled := vars(command_type).get(COMPILERCACHE):
+        return compiled
+
+    if cache is not None and (compiled := cache.get(command_type)):
+        setattr(command_type, COMPILERCACHE, compiled)
+        return compiled
+
+    command_meta = get_command_meta(command_type)
     subcommands = {
-        get_command_meta(subcommand).name: subcommand
+        get_command_name(subcommand): subcommand
         for subcommand in command_meta.subcommands.values()
     }
 
-    parameter_instances = get_parameter_instances(command).values()
-    flattened_params = flatten_parameters(*parameter_instances)
-    arguments, options = compile_parameters(flattened_params)
+    flattened_params = []
+    for attr_name, parameters_type in command_meta.parameters.items():
+        flattened_params.extend(flatten_parameter_types(parameters_type, (attr_name,)))
+    arguments, options, owner_paths = compile_parameters(tuple(flattened_params))
+    sources = compile_sources(tuple(flattened_params), arguments, options, owner_paths)
+
+    owner_types = [owner_type(command_meta.parameters, path) for path in owner_paths]
+    validated = frozenset(
+        index
+        for index, parameters_type in enumerate(owner_types)
+        if get_param_meta(parameters_type).validators
+    )
+    owner_masks, constraints = compile_groups(
+        tuple(flattened_params), arguments, options, owner_paths, owner_types
+    )
+
+    long_options = {
+        name: option for name, option in options.items() if name.startswith("--")
+    }
+    # Exact names only, the help option isn't abbreviated
+    help_option = CompilerOption(CompilerHelp())
+    for name in HELP_OPTIONS:
+        options.setdefault(name, help_option)
+    compiled = CompilerCommand(
+        options=options,
+        arguments=arguments,
+        subcommands=subcommands,
+        option_trie=OptionTrie(long_options),
+        fan_out=next(
+            (
+                (argument.action.owner, argument.action.member_name)
+                for argument in arguments
+                if argument.fan_out
+            ),
+            None,
+        ),
+        owner_paths=owner_paths,
+        sources=sources,
+        validated=validated,
+        owner_masks=owner_masks,
+        constraints=constraints,
+    )
+    setattr(command_type, COMPILERCACHE, compiled)
+    if cache is not None:
+        cache.put(command_type, compiled)
+
+    return compiled
+
 
-    return CompilerCommand(options=options, arguments=arguments, subcommands=subcommands)
+def compile_command(command: Command, cache: Any = None) -> CompilerCommand:
+    return compile_command_type(type(command), cache).bind(command)
@@ -0,0 +1,159 @@
+# Answers completion queries from a prebuilt index. Runs on every keystroke, so
+# it must not import anything from heated or the application, and is run as a
+# script rather than through the package.
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+
+
+# Index layout, one node per command:
+# {"subcommands": {name: node}, "options": {name: [takes_value, help]},
+#  "arguments": [name]}
+# On disk each subcommand node is stored as its own marshal blob and only decoded
+# when the query descends into it, so a query never decodes the whole tree
+# Annotations are never evaluated, typing isn't imported to save startup time
+CompletionIndex = dict
+
+
+class Completions:
+    __slots__ = ("candidates", "argument")
+
+    def __init__(
+        self, candidates: list[tuple[str, str]] = None, argument: str | None = None
+    ):
+        self.candidates = candidates or []
+        # Positional argument expected at the cursor, if any
+        self.argument = argument
+
+
+def load_completion_index(path: str | os.PathLike) -> CompletionIndex:
+    # marshal loads much faster than json, which would also import re
+    with open(path, "rb") as f:
+        return marshal.load(f)
+
+
+def complete(index: CompletionIndex, words: list[str]) -> Completions:
+    # The last word is the one being completed
+    *previous, current = words or [""]
+    node = index
+    expect_value = False
+    end_opts = False
+    position = 0
+
+    for word in previous:
+        if expect_value:
+            expect_value = False
+        elif end_opts:
+            position += 1
+        elif word == "--":
+            end_opts = True
+        elif word in node["subcommands"]:
+            node = node["subcommands"][word]
+            if isinstance(node, bytes):
+                node = marshal.loads(node)
+            position = 0
+        elif word.startswith("-") and len(word) > 1:
+            name, equals, _ = word.partition("=")
+            option = node["options"].get(name)
+            expect_value = bool(option and option[0] and not equals)
+        else:
+            position += 1
+
+    if expect_value:
+        return Completions()
+
+    arguments = node["arguments"]
+    argument = arguments[position] if position < len(arguments) else None
+
+    if end_opts:
+        return Completions(argument=argument)
+
+    if current.startswith("-"):
+        candidates = [
+            (name, option[1])
+            for name, option in node["options"].items()
+            if name.startswith(current)
+        ]
+    else:
+        candidates = [
+            (name, "") for name in node["subcommands"] if name.startswith(current)
+        ]
+
+    return Completions(candidates=sorted(candidates), argument=argument)
+
+
+def format_completions(completions: Completions, shell: str) -> str:
+    lines = []
+    for name, description in completions.candidates:
+        if shell == "zsh":
+            name = name.replace(":", "\\:")
+            lines.append(f"{name}:{description}" if description else name)
+        elif shell == "fish":
+            lines.append(f"{name}\t{description}" if description else name)
+        else:
+            lines.append(name)
+    return "\n".join(lines)
+
+
+BASH_SCRIPT = """\
+_heated_complete_{func}() {{
+    local IFS=$'\\n'
+    COMPREPLY=($({python} -S -E {script} {index} bash \\
+        "${{COMP_WORDS[@]:1:COMP_CWORD}}"))
+}}
+complete -o default -F _heated_complete_{func} {prog}
+"""
+
+ZSH_SCRIPT = """\
+#compdef {prog}
+_heated_complete_{func}() {{
+    local -a candidates
+    candidates=("${{(@f)$({python} -S -E {script} {index} zsh \\
+        "${{(@)words[2,CURRENT]}}")}}")
+    if [[ -n "$candidates" ]]; then
+        _describe '{prog}' candidates
+    else
+        _files
+    fi
+}}
+compdef _heated_complete_{func} {prog}
+"""
+
+FISH_SCRIPT = """\
+function __heated_complete_{func}
+    set -l words (commandline -opc) (commandline -ct)
+    {python} -S -E {script} {index} fish $words[2..-1]
+end
+complete -c {prog} -a '(__heated_complete_{func})'
+"""
+
+SHELL_SCRIPTS = {"bash": BASH_SCRIPT, "zsh": ZSH_SCRIPT, "fish": FISH_SCRIPT}
+
+
+def shell_script(shell: str, prog: str, index_path: str, python: str = None) -> str:
+    return SHELL_SCRIPTS[shell].format(
+        func="".join(char if char.isalnum() else "_" for char in prog),
+        prog=prog,
+        index=index_path,
+        python=python or sys.executable,
+        # Run by path, -S -E skip site and the package import on every keystroke
+        script=os.path.abspath(__file__),
+    )
+
+
+def main():
+    # python heated/complete.py INDEX SHELL WORDS...
+    if len(sys.argv) < 3 or sys.argv[2] not in SHELL_SCRIPTS:
+        sys.stderr.write("usage: complete.py INDEX bash|zsh|fish ...\n")
+        sys.exit(2)
+
+    index = load_completion_index(sys.argv[1])
+    output = format_completions(complete(index, sys.argv[3:]), sys.argv[2])
+    if output:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import marshal
+import os
+from typing import Any, Type, Union
+
+from .command import get_command_meta, get_command_name, load_command
+from .complete import CompletionIndex
+from .parameters import Argument, Flag, Option, get_flat_parameters
+
+
+def build_completion_index(command: Union[Type, Any]) -> CompletionIndex:
+    command_type = load_command(command)
+    meta = get_command_meta(command_type)
+
+    options = {}
+    arguments = []
+    for parameters_type in meta.parameters.values():
+        for flat in get_flat_parameters(parameters_type):
+            parameter = flat.parameter
+            if isinstance(parameter, Argument):
+                arguments.append(min(parameter.names, default=flat.member_name))
+            elif isinstance(parameter, (Option, Flag)):
+                for name in parameter.names:
+                    options[name] = [isinstance(parameter, Option), parameter.help]
+
+    subcommands = {
+        get_command_name(subcommand): build_completion_index(subcommand)
+        for subcommand in meta.subcommands.values()
+    }
+
+    return {"subcommands": subcommands, "options": options, "arguments": arguments}
+
+
+def encode_completion_index(index: CompletionIndex) -> CompletionIndex:
+    # Subcommand nodes become marshal blobs that complete() decodes on demand
+    subcommands = {
+        name: marshal.dumps(encode_completion_index(node))
+        for name, node in index["subcommands"].items()
+    }
+    return {**index, "subcommands": subcommands}
+
+
+def write_completion_index(command: Type, path: Union[str, os.PathLike]):
+    with open(path, "wb") as f:
+        marshal.dump(encode_completion_index(build_completion_index(command)), f)
@@ -1,8 +1,28 @@
-from dataclasses import dataclass
-from typing import Any
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Optional
+
+from .timing import PhaseTiming
 
 
 @dataclass
 class Context:
     exit_code: int = 0
     obj: Any = None
+    timings: list[PhaseTiming] = field(default_factory=list)
+    # Shared by every command of the chain, e.g. sessions opened by a parent
+    resources: dict[str, Any] = field(default_factory=dict)
+    _async_exit_stack: Optional[AsyncExitStack] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    async def enter_async_context(self, context_manager: AsyncContextManager) -> Any:
+        # Closed once the whole command chain has been invoked
+        if self._async_exit_stack is None:
+            self._async_exit_stack = AsyncExitStack()
+        return await self._async_exit_stack.enter_async_context(context_manager)
+
+    async def aclose(self):
+        if self._async_exit_stack is not None:
+            exit_stack, self._async_exit_stack = self._async_exit_stack, None
+            await exit_stack.aclose()
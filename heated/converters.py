@@ -0,0 +1,150 @@
+import enum
+import types
+from datetime import date, datetime, time
+from typing import Any, Callable, Literal, Type, Union, get_args, get_origin
+
+
+Converter = Callable[[str], Any]
+
+# Exact types with a conversion other than calling the type
+CONVERTERS: dict[Type, Converter] = {}
+# Resolved converters by annotation, every annotation is resolved only once
+_converter_cache: dict[Any, Converter] = {}
+
+
+class ConversionError(ValueError):
+    def __init__(self, value: str, expected: str, message: str = None):
+        self.value = value
+        self.expected = expected
+        if not message:
+            message = f"Invalid value {value!r}, expected {expected}"
+        super().__init__(message)
+
+
+def register_converter(type_: Type, converter: Converter):
+    CONVERTERS[type_] = converter
+    _converter_cache.clear()
+
+
+def get_converter(annotation: Any) -> Converter:
+    try:
+        return _converter_cache[annotation]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable annotation, e.g. Literal with a list in it
+        return build_converter(annotation)
+
+    converter = _converter_cache[annotation] = build_converter(annotation)
+    return converter
+
+
+def build_converter(annotation: Any) -> Converter:
+    if annotation is Any or annotation is str:
+        return str
+    if annotation in CONVERTERS:
+        return CONVERTERS[annotation]
+
+    origin = get_origin(annotation)
+    if origin is Union or origin is getattr(types, "UnionType", None):
+        return union_converter(annotation)
+    if origin is Literal:
+        return literal_converter(annotation)
+    if origin in (list, tuple, set, frozenset):
+        return sequence_converter(annotation)
+
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return enum_converter(annotation)
+    if callable(annotation):
+        return annotation
+
+    raise TypeError(f"No converter for {annotation!r}")
+
+
+def type_name(annotation: Any) -> str:
+    return getattr(annotation, "__name__", None) or repr(annotation)
+
+
+def union_converter(annotation: Any) -> Converter:
+    # Optional[X] converts as X, the value is never None when it's given
+    options = [arg for arg in get_args(annotation) if arg is not type(None)]
+    if len(options) == 1:
+        return get_converter(options[0])
+
+    converters = [get_converter(option) for option in options]
+    expected = " or ".join(type_name(option) for option in options)
+
+    def convert_union(value: str) -> Any:
+        for convert in converters:
+            try:
+                return convert(value)
+            except ValueError:
+                pass
+        raise ConversionError(value, expected)
+
+    return convert_union
+
+
+def literal_converter(annotation: Any) -> Converter:
+    choices = {str(choice): choice for choice in get_args(annotation)}
+    expected = "one of " + ", ".join(choices)
+
+    def convert_literal(value: str) -> Any:
+        try:
+            return choices[value]
+        except KeyError:
+            raise ConversionError(value, expected) from None
+
+    return convert_literal
+
+
+def enum_converter(enum_type: Type[enum.Enum]) -> Converter:
+    # Members by name first, then by the string form of their value
+    choices = {str(member.value): member for member in enum_type}
+    choices.update(enum_type.__members__)
+    expected = "one of " + ", ".join(enum_type.__members__)
+
+    def convert_enum(value: str) -> enum.Enum:
+        try:
+            return choices[value]
+        except KeyError:
+            raise ConversionError(value, expected) from None
+
+    return convert_enum
+
+
+def sequence_converter(annotation: Any) -> Converter:
+    # A single value holds comma separated elements, list[int] takes "1,2,3"
+    container = get_origin(annotation)
+    args = [arg for arg in get_args(annotation) if arg is not Ellipsis]
+    convert_element = get_converter(args[0]) if args else str
+
+    def convert_sequence(value: str) -> Any:
+        return container(map(convert_element, value.split(",")))
+
+    return convert_sequence
+
+
+def element_converter(annotation: Any) -> Converter:
+    # list[int] -> int, anything else is converted as the element itself
+    if get_origin(annotation) in (list, tuple, set, frozenset):
+        if args := [arg for arg in get_args(annotation) if arg is not Ellipsis]:
+            return get_converter(args[0])
+        return str
+    return get_converter(annotation)
+
+
+def convert_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise ConversionError(value, "a boolean")
+
+
+register_converter(bool, convert_bool)
+register_converter(bytes, str.encode)
+register_converter(datetime, datetime.fromisoformat)
+register_converter(date, date.fromisoformat)
+register_converter(time, time.fromisoformat)
@@ -0,0 +1,82 @@
+import io
+import json
+import os
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import BinaryIO
+
+from .app import App
+
+
+class _FrameStream(io.TextIOBase):
+    def __init__(self, wfile: BinaryIO, stream: str):
+        self.wfile = wfile
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if data:
+            frame = {"stream": self.stream, "data": data}
+            self.wfile.write(json.dumps(frame).encode() + b"\n")
+        return len(data)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "Daemon"
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        stdout = _FrameStream(self.wfile, "stdout")
+        stderr = _FrameStream(self.wfile, "stderr")
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            exit_code = self.server.execute(
+                request["args"], request.get("env"), request.get("cwd")
+            )
+
+        self.wfile.write(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+
+class Daemon(socketserver.UnixStreamServer):
+    # Requests are handled one at a time, each one temporarily owns the
+    # process' environment and working directory
+
+    def __init__(self, app: App, socket_path: str):
+        self.app = app
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+
+    def execute(self, args: list[str], env: dict[str, str] = None, cwd: str = None):
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        try:
+            if env is not None:
+                os.environ.clear()
+                os.environ.update(env)
+            if cwd is not None:
+                os.chdir(cwd)
+
+            return self.app.execute(args)
+        except SystemExit as error:
+            if error.code is None or isinstance(error.code, int):
+                return error.code or 0
+            print(error.code, file=sys.stderr)
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
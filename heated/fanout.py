@@ -0,0 +1,166 @@
+import asyncio
+import copy
+import io
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, Optional, TextIO
+
+from .command import Command
+from .compiler import CompilerCommand
+from .context import Context
+from .parameters import Flag, Option, Parameters
+
+
+class Jobs(Parameters):
+    jobs: int = Option("--jobs", "-j", default=1, help="Number of parallel jobs")
+    processes: bool = Flag("--processes", help="Run jobs in processes, not threads")
+
+
+# Output buffer of the job running in the current thread or task
+_job_output: ContextVar[Optional[io.StringIO]] = ContextVar("job_output", default=None)
+
+
+class _CapturedStdout(io.TextIOBase):
+    # Sends writes from a job to that job's buffer, anything else to the
+    # original stream
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        if (buffer := _job_output.get()) is None:
+            return self.stream.write(data)
+        return buffer.write(data)
+
+    def flush(self):
+        if _job_output.get() is None:
+            self.stream.flush()
+
+
+def _capture_stdout() -> io.StringIO:
+    if not isinstance(sys.stdout, _CapturedStdout):
+        sys.stdout = _CapturedStdout(sys.stdout)
+
+    buffer = io.StringIO()
+    _job_output.set(buffer)
+    return buffer
+
+
+def _invoke_item(command: Command) -> tuple[str, int]:
+    buffer = _capture_stdout()
+    try:
+        command.invoke()
+    finally:
+        _job_output.set(None)
+
+    return buffer.getvalue(), command.context.exit_code
+
+
+async def _invoke_item_async(command: Command) -> tuple[str, int]:
+    # Runs in its own task, so the buffer only applies to this job
+    buffer = _capture_stdout()
+    await command.invoke()
+
+    return buffer.getvalue(), command.context.exit_code
+
+
+def _item_command(
+    command: Command, compiled: CompilerCommand, context: Context, item: Any
+) -> Command:
+    # Copy the command and every Parameters instance on the way to the fan out
+    # member, everything else is shared
+    owner_index, member_name = compiled.fan_out
+    item_command = copy.copy(command)
+    item_command.context = context
+
+    owner = item_command
+    for attr_name in compiled.owner_paths[owner_index]:
+        child = copy.copy(getattr(owner, attr_name))
+        setattr(owner, attr_name, child)
+        owner = child
+    setattr(owner, member_name, item)
+
+    return item_command
+
+
+def _fan_out_items(compiled: CompilerCommand) -> list[Any]:
+    owner_index, member_name = compiled.fan_out
+    return getattr(compiled.owners[owner_index], member_name) or []
+
+
+def _find_jobs(compiled: CompilerCommand) -> Optional[Jobs]:
+    return next((owner for owner in compiled.owners if isinstance(owner, Jobs)), None)
+
+
+def _workers(jobs: Optional[Jobs]) -> int:
+    return max(jobs.jobs if jobs else 1, 1)
+
+
+def _write_results(results: list[tuple[str, int]], stream: TextIO, context: Context):
+    # Results are in input order, so output is printed in order too
+    for output, exit_code in results:
+        stream.write(output)
+        context.exit_code = max(context.exit_code, exit_code)
+
+
+def invoke_fan_out(command: Command, compiled: CompilerCommand, context: Context):
+    jobs = _find_jobs(compiled)
+    workers = _workers(jobs)
+    processes = workers > 1 and jobs.processes
+
+    commands = []
+    for item in _fan_out_items(compiled):
+        if processes:
+            # obj and resources (sessions, pools) can't cross a process
+            # boundary, jobs in processes get a fresh context
+            item_context = Context()
+        else:
+            item_context = replace(context, exit_code=0, timings=[])
+        commands.append(_item_command(command, compiled, item_context, item))
+
+    executor: Optional[Executor] = None
+    if processes:
+        executor = ProcessPoolExecutor(workers)
+    elif workers > 1:
+        executor = ThreadPoolExecutor(workers)
+
+    saved_stdout = sys.stdout
+    try:
+        runner = executor.map if executor else map
+        _write_results(runner(_invoke_item, commands), saved_stdout, context)
+    finally:
+        sys.stdout = saved_stdout
+        if executor is not None:
+            executor.shutdown()
+
+
+async def invoke_fan_out_async(
+    command: Command, compiled: CompilerCommand, context: Context
+):
+    # Jobs of an async command are tasks in the running loop, so they can use
+    # resources opened by parent commands. --jobs limits how many run at once,
+    # --processes does not apply.
+    semaphore = asyncio.Semaphore(_workers(_find_jobs(compiled)))
+
+    async def invoke_item(item_command: Command) -> tuple[str, int]:
+        async with semaphore:
+            return await _invoke_item_async(item_command)
+
+    commands = [
+        _item_command(
+            command, compiled, replace(context, exit_code=0, timings=[]), item
+        )
+        for item in _fan_out_items(compiled)
+    ]
+
+    saved_stdout = sys.stdout
+    try:
+        results = await asyncio.gather(*(invoke_item(item) for item in commands))
+        _write_results(results, saved_stdout, context)
+    finally:
+        sys.stdout = saved_stdout
@@ -0,0 +1,231 @@
+import importlib
+import inspect
+import os
+import pprint
+from typing import Any, Iterable, Optional, Type, Union
+
+from .app import App, RemainingArguments
+from .command import (
+    Command,
+    LazyCommand,
+    get_command_meta,
+    get_command_name,
+    load_command,
+)
+from .compiler import compile_command
+from .context import Context
+from .help import HELP_OPTIONS, HelpRequested, help_text
+from .parameters import Argument, Flag, Option, get_flat_parameters
+from .parser import Parser
+
+
+# Frozen grammar layout, one node per command:
+# {"path": "module:Qualname", "help": str, "help_text": str,
+#  "options": {name: [takes_value, help, option_id]},
+#  "arguments": [[name, nargs, repeats, help]],
+#  "subcommands": {name: node}}
+FrozenGrammar = dict
+
+MODULE_TEMPLATE = '''\
+"""Frozen command line grammar for {entry}, generated by heated build.
+
+Parses with the grammar below and only imports the modules of the commands
+that are selected on the command line.
+"""
+
+GRAMMAR = {grammar}
+
+
+def main():
+    from heated.freeze import FrozenApp
+
+    FrozenApp(GRAMMAR).run()
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+class FreezeError(Exception):
+    def __init__(self, command: Any, message: str = None):
+        self.command = command
+        if not message:
+            message = f"{command} can't be imported by path, define it in a module"
+        super().__init__(message)
+
+
+def command_path(command: Union[Type, LazyCommand]) -> str:
+    if isinstance(command, LazyCommand):
+        return command.path
+    if "<locals>" in command.__qualname__:
+        raise FreezeError(command)
+    return f"{command.__module__}:{command.__qualname__}"
+
+
+def freeze_command(command: Union[Type, LazyCommand]) -> FrozenGrammar:
+    path = command_path(command)
+    command_type = load_command(command)
+    meta = get_command_meta(command_type)
+
+    flat_parameters = [
+        flat
+        for parameters_type in meta.parameters.values()
+        for flat in get_flat_parameters(parameters_type)
+    ]
+
+    options = {}
+    arguments = []
+    for option_id, flat in enumerate(flat_parameters):
+        parameter = flat.parameter
+        if isinstance(parameter, Argument):
+            name = min(parameter.names, default=flat.member_name)
+            repeats = parameter.fan_out or parameter.nargs in ("*", "+")
+            arguments.append([name, parameter.nargs, repeats, parameter.help])
+        elif isinstance(parameter, (Option, Flag)):
+            takes_value = isinstance(parameter, Option)
+            for name in parameter.names:
+                options[name] = [takes_value, parameter.help, option_id]
+
+    return {
+        "path": path,
+        "help": inspect.getdoc(command_type) or "",
+        # Rendered --help output, shown without importing the command
+        "help_text": help_text(command_type),
+        "options": options,
+        "arguments": arguments,
+        "subcommands": {
+            get_command_name(subcommand): freeze_command(subcommand)
+            for subcommand in meta.subcommands.values()
+        },
+    }
+
+
+def write_frozen_module(
+    command: Union[Type, LazyCommand], path: Union[str, os.PathLike]
+):
+    grammar = freeze_command(command)
+    text = pprint.pformat(grammar, width=88, sort_dicts=False)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(MODULE_TEMPLATE.format(entry=grammar["path"], grammar=text))
+
+
+def load_entry(path: str) -> Type:
+    # "module:attr" naming a Command class or an App
+    module_name, _, qualname = path.partition(":")
+    entry = importlib.import_module(module_name)
+    for attr_name in qualname.split("."):
+        entry = getattr(entry, attr_name)
+    if isinstance(entry, App):
+        return entry.entry_command
+    return entry
+
+
+def _long_option(node: FrozenGrammar, arg: str) -> Optional[list]:
+    # Exact name or unique abbreviation, as the option trie matches them
+    name = arg.partition("=")[0]
+    if name in node["options"]:
+        return node["options"][name]
+    matches = [
+        option
+        for option_name, option in node["options"].items()
+        if option_name.startswith("--") and option_name.startswith(name)
+    ]
+    # Aliases of one option share its id
+    if len(name) > 2 and len({match[2] for match in matches}) == 1:
+        return matches[0]
+    return None
+
+
+def split_chain(
+    grammar: FrozenGrammar, args: list[str]
+) -> list[tuple[FrozenGrammar, list[str]]]:
+    # Splits the arguments at each subcommand following the Parser's rules,
+    # without importing any command
+    chain = []
+    node = grammar
+    start = 0
+    index = 0
+    position = 0
+
+    while index < len(args):
+        arg = args[index]
+        options = node["options"]
+        arguments = node["arguments"]
+
+        if not arg or arg == "--":
+            # Everything else belongs to this command
+            index = len(args)
+            break
+        if arg in node["subcommands"]:
+            chain.append((node, args[start:index]))
+            node = node["subcommands"][arg]
+            start = index = index + 1
+            position = 0
+            continue
+
+        if arg in options:
+            index += 2 if options[arg][0] else 1
+        elif arg in HELP_OPTIONS:
+            raise HelpRequested(node["help_text"])
+        elif arg.startswith("--") and (option := _long_option(node, arg)):
+            index += 2 if option[0] and "=" not in arg else 1
+        elif arg[0] == "-" and len(arg) > 2 and f"-{arg[1]}" in options:
+            # Short option cluster, the first one taking a value ends it
+            index += 1
+            for char_index in range(1, len(arg)):
+                option = options.get(f"-{arg[char_index]}")
+                if option is not None and option[0]:
+                    if char_index == len(arg) - 1:
+                        index += 1
+                    break
+        elif position < len(arguments):
+            _, nargs, repeats, _ = arguments[position]
+            if nargs is None or nargs == "?":
+                index += 1
+            else:
+                limit = nargs if isinstance(nargs, int) else len(args)
+                taken = 0
+                while index < len(args) and taken < limit:
+                    if args[index].startswith("-") and args[index] != "-":
+                        break
+                    index += 1
+                    taken += 1
+            if not repeats:
+                position += 1
+        else:
+            # Surplus values, left for the parser to report
+            index = len(args)
+
+    chain.append((node, args[start:]))
+    return chain
+
+
+class FrozenApp(App):
+    # Parses with a frozen grammar, only the commands on the command line are
+    # imported
+    def __init__(self, grammar: FrozenGrammar, **kwargs):
+        super().__init__(**kwargs)
+        self.grammar = grammar
+
+    def parse(self, args: Iterable[str], context: Context = None) -> list[Command]:
+        context = context or Context()
+        commands = []
+
+        for node, segment in split_chain(self.grammar, list(args)):
+            command_type = LazyCommand(node["path"]).load()
+            command = command_type(context=context)
+            compiled_command = compile_command(command, self.grammar_cache)
+            if compiled_command.sources:
+                self.sources.apply(compiled_command)
+
+            try:
+                _, remaining_args = Parser.parse_args(compiled_command, segment)
+            except HelpRequested:
+                raise HelpRequested(node["help_text"]) from None
+            compiled_command.validate()
+            if remaining_args:
+                raise RemainingArguments(list(remaining_args))
+            commands.append(command)
+
+        return commands
@@ -0,0 +1,118 @@
+import inspect
+from typing import Any, Type, Union
+
+from .command import LazyCommand, get_command_meta, get_command_name
+from .parameters import Argument, Flag, Option, get_flat_parameters
+
+
+HELPCACHE = "_help_text_"
+# Added to every command that doesn't define these names itself
+HELP_OPTIONS = ("-h", "--help")
+HELP_WIDTH = 80
+# Longer names put their help on the next line
+NAMES_WIDTH = 24
+
+
+class HelpRequested(Exception):
+    # Raised by the help option, the text is filled in by the App which knows
+    # the command being parsed
+    def __init__(self, text: str = None):
+        self.text = text
+        super().__init__("Help requested")
+
+
+def command_summary(command: Union[Type, LazyCommand]) -> str:
+    # First line of the description, lazy commands aren't imported for it
+    if isinstance(command, LazyCommand):
+        return command.help
+    return (inspect.getdoc(command) or "").partition("\n")[0]
+
+
+def argument_usage(name: str, argument: Argument) -> str:
+    if argument.fan_out or argument.nargs == "+":
+        return f"{name}..."
+    if argument.nargs == "*":
+        return f"[{name}...]"
+    if argument.nargs == "?":
+        return f"[{name}]"
+    if isinstance(argument.nargs, int):
+        return " ".join([name] * argument.nargs)
+    return name
+
+
+def format_rows(rows: list[tuple[str, str]]) -> list[str]:
+    # Only imported once help is rendered, textwrap imports re
+    import textwrap
+
+    lines = []
+    for names, text in rows:
+        wrapped = textwrap.wrap(text, HELP_WIDTH - NAMES_WIDTH - 4) or [""]
+        if len(names) > NAMES_WIDTH:
+            lines.append(f"  {names}")
+        else:
+            lines.append(f"  {names:{NAMES_WIDTH}}  {wrapped.pop(0)}".rstrip())
+        lines.extend(f"  {'':{NAMES_WIDTH}}  {line}" for line in wrapped)
+    return lines
+
+
+def render_help(command_type: Type) -> str:
+    meta = get_command_meta(command_type)
+
+    usage = [meta.name]
+    arguments = []
+    options = []
+    taken = set()
+    for parameters_type in meta.parameters.values():
+        for flat in get_flat_parameters(parameters_type):
+            parameter = flat.parameter
+            taken.update(parameter.names)
+            if isinstance(parameter, Argument):
+                name = min(parameter.names, default=flat.member_name.upper())
+                usage.append(argument_usage(name, parameter))
+                arguments.append((name, parameter.help))
+            elif isinstance(parameter, (Option, Flag)):
+                # Short names first
+                names = ", ".join(sorted(parameter.names, key=lambda n: (len(n), n)))
+                if isinstance(parameter, Option):
+                    names = f"{names} {flat.member_name.upper()}"
+                options.append((names, parameter.help))
+
+    if help_names := [name for name in HELP_OPTIONS if name not in taken]:
+        options.append((", ".join(help_names), "Show this help and exit"))
+    if options:
+        usage.insert(1, "[OPTIONS]")
+    if meta.subcommands:
+        usage.append("[COMMAND]")
+
+    sections = [f"Usage: {' '.join(usage)}"]
+    if description := inspect.getdoc(command_type):
+        sections.append(description)
+    if arguments:
+        sections.append("\n".join(["Arguments:", *format_rows(arguments)]))
+    if options:
+        sections.append("\n".join(["Options:", *format_rows(options)]))
+    if meta.subcommands:
+        rows = [
+            (get_command_name(subcommand), command_summary(subcommand))
+            for subcommand in meta.subcommands.values()
+        ]
+        sections.append("\n".join(["Commands:", *format_rows(rows)]))
+
+    return "\n\n".join(sections) + "\n"
+
+
+def help_text(command_type: Type, cache: Any = None) -> str:
+    # Rendered once per command class, only when it is asked for
+    if text := vars(command_type).get(HELPCACHE):
+        return text
+
+    if cache is not None and (text := cache.get_help(command_type)):
+        setattr(command_type, HELPCACHE, text)
+        return text
+
+    text = render_help(command_type)
+    setattr(command_type, HELPCACHE, text)
+    if cache is not None:
+        cache.put_help(command_type, text)
+
+    return text
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Optional, Type, get_type_hints
+import inspect
+from operator import attrgetter
+from typing import Any, Callable, Optional, Type, Union, get_type_hints
 
 
 PARAMMETA = "_param_meta_"
@@ -11,6 +13,15 @@ class ParameterMeta:
     definitions: dict[str, Parameter] = field(default_factory=dict)
     child_parameters: dict[str, Type] = field(default_factory=dict)
     name: Optional[str] = None
+    defaults: dict[str, Any] = field(default_factory=dict)
+    annotations: dict[str, Type] = field(default_factory=dict)
+    # False until the annotations could be evaluated, forward references are
+    # resolved on first use
+    resolved: bool = False
+    flat: Optional[tuple[FlatParameter]] = field(default=None, repr=False)
+    instance_type: Optional[Type] = field(default=None, repr=False)
+    validators: tuple[Validator, ...] = ()
+    groups: tuple[ParameterGroup, ...] = ()
 
 
 def is_parameters(obj: Any) -> bool:
@@ -25,92 +36,295 @@ def get_param_meta(parameters: Any) -> ParameterMeta:
 
 
 class Parameter:
-    def __init__(self, *names: str, default=None, help: str = ""):
+    def __init__(
+        self,
+        *names: str,
+        default=None,
+        help: str = "",
+        env: str = None,
+        config: str = None,
+    ):
         self.names = set(names)
         self.default = default
         self.help = help
+        # Environment variable and dotted config file key that are used when
+        # the parameter isn't on the command line, the environment first
+        self.env = env
+        self.config = config
+
+
+OPTION_ACTIONS = ("store", "append", "extend")
+FLAG_ACTIONS = ("store", "count")
+NARGS = ("?", "*", "+")
 
 
 class Option(Parameter):
-    def __init__(self, *names: str, default=None, help: str = ""):
-        super().__init__(*names, default=default, help=help)
+    def __init__(
+        self,
+        *names: str,
+        default=None,
+        help: str = "",
+        action: str = "store",
+        env: str = None,
+        config: str = None,
+    ):
+        if action not in OPTION_ACTIONS:
+            raise ValueError(
+                f"Unknown option action {action}, expected {OPTION_ACTIONS}"
+            )
+        super().__init__(*names, default=default, help=help, env=env, config=config)
+        # "append" collects every occurrence, "extend" also splits each value
+        # on commas
+        self.action = action
 
 
 class Argument(Parameter):
-    def __init__(self, *names: str, default=None, help: str = ""):
-        super().__init__(*names, default=default, help=help)
+    def __init__(
+        self,
+        *names: str,
+        default=None,
+        help: str = "",
+        fan_out: bool = False,
+        nargs: Union[int, str, None] = None,
+        env: str = None,
+        config: str = None,
+    ):
+        if nargs is not None and nargs not in NARGS and not isinstance(nargs, int):
+            raise ValueError(f"Unknown nargs {nargs}, expected a count or {NARGS}")
+        super().__init__(*names, default=default, help=help, env=env, config=config)
+        # Collects every remaining positional value, the App invokes the
+        # command once per value
+        self.fan_out = fan_out
+        # Number of consecutive values, "*" and "+" take every one up to the
+        # next option
+        self.nargs = nargs
 
 
 class Flag(Parameter):
-    def __init__(self, *names: str, default: bool = False, help: str = ""):
-        super().__init__(*names, default=default, help=help)
+    def __init__(
+        self,
+        *names: str,
+        default: bool = False,
+        help: str = "",
+        action: str = "store",
+        env: str = None,
+        config: str = None,
+    ):
+        if action not in FLAG_ACTIONS:
+            raise ValueError(f"Unknown flag action {action}, expected {FLAG_ACTIONS}")
+        # "count" adds one for every occurrence, -vvv
+        if action == "count" and default is False:
+            default = 0
+        super().__init__(*names, default=default, help=help, env=env, config=config)
+        self.action = action
 
 
 # endregion
 
 
-class Parameters:
+# region Validation
+
+
+class ParametersValidationError(Exception):
+    def __init__(self, validator: str, message: str = None):
+        self.validator = validator
+        if not message:
+            message = f"Parameters failed validation: {validator}"
+        super().__init__(message)
+
+
+class Validator:
+    # Arguments are injected by parameter name. The signature is read once
+    # here, a call is only an attrgetter and the function itself
+    def __init__(self, func: Callable[..., Any]):
+        self.func = func
+        self.names = tuple(inspect.signature(func).parameters)
+        self._getter = attrgetter(*self.names) if self.names else None
+
+    def __call__(self, parameters: Any):
+        if self._getter is None:
+            result = self.func()
+        elif len(self.names) == 1:
+            result = self.func(self._getter(parameters))
+        else:
+            result = self.func(*self._getter(parameters))
+
+        # Returning False fails too, anything else passes
+        if result is False:
+            raise ParametersValidationError(self.func.__name__)
+
+
+def validator(func: Callable[..., Any]) -> Validator:
+    return Validator(func)
+
+
+class ParameterGroup:
+    # Constraint over parameters of the same class, named by attribute
+    def __init__(self, *names: str):
+        self.names = names
+
+
+class Exclusive(ParameterGroup):
+    # At most one of the parameters may be given
+    pass
+
+
+class Required(ParameterGroup):
+    # Every one of the parameters must be given
+    pass
+
+
+class AtLeastOne(ParameterGroup):
+    # One or more of the parameters must be given
+    pass
+
+
+# endregion
+
+
+class ParametersType(type):
+    def __new__(mcs, cls_name, bases, namespace, /, **kwargs):
+        # Instances are created from a generated subclass with a slot for every
+        # parameter, the declared classes must not add a __dict__
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, cls_name, bases, namespace, **kwargs)
+
+
+class Parameters(metaclass=ParametersType):
+    __slots__ = ()
+
     def __init_subclass__(cls, /, name: str = None, **kwargs):
+        # Generated instance types share the meta of the declared class
+        if PARAMMETA in vars(cls):
+            return
+
         if not name:
             name = cls.__name__.lower()
 
         # Future parameter definition
         parameters = {}
-        child_parameters = {}
-
-        # Collect all the attribute names, values, and types
-        annotations = get_type_hints(cls)
-        cls_vars = vars(cls)
-
-        for attr_name, definition in cls_vars.items():
-            # Copy the parameter definition to the _paramdef dictionary
-            # Assign the default value to the attribute
-            # If there's no type annotation, make the default a string
-            if isinstance(definition, Option) or isinstance(definition, Flag):
-                parameters[attr_name] = definition
-                annotations.setdefault(attr_name, Optional[str])
-            elif isinstance(definition, Argument):
-                parameters[attr_name] = definition
-                annotations.setdefault(attr_name, str)
-
-        # Save child parameter groups
-        for attr_name, type_ in annotations.items():
-            if type_ and issubclass(type_, Parameters):
-                child_parameters[attr_name] = type_
+        validators = {}
+        groups = {}
+        annotated = set()
+
+        # Merge the definitions of the whole MRO, the first base wins
+        for mro_cls in reversed(cls.__mro__):
+            annotated.update(vars(mro_cls).get("__annotations__", {}))
+            for attr_name, definition in vars(mro_cls).items():
+                if isinstance(definition, Parameter):
+                    parameters[attr_name] = definition
+                elif isinstance(definition, Validator):
+                    validators[attr_name] = definition
+                elif isinstance(definition, ParameterGroup):
+                    groups[attr_name] = definition
+
+        for attr_name, definition in validators.items():
+            if unknown := set(definition.names) - set(parameters) - annotated:
+                raise TypeError(
+                    f"Validator {attr_name} takes unknown parameters {unknown}"
+                )
+        for attr_name, group in groups.items():
+            if unknown := set(group.names) - set(parameters):
+                raise TypeError(f"Group {attr_name} names unknown parameters {unknown}")
 
         meta = ParameterMeta(
-            definitions=parameters, child_parameters=child_parameters, name=name
+            definitions=parameters,
+            name=name,
+            defaults={
+                attr_name: definition.default
+                for attr_name, definition in parameters.items()
+            },
+            validators=tuple(validators.values()),
+            groups=tuple(groups.values()),
         )
         setattr(cls, PARAMMETA, meta)
-        setattr(cls, "__annotations__", annotations)
 
-    def __new__(cls, *args, **kwargs):
-        instance = super().__new__(cls)
+        try:
+            resolve_param_meta(cls)
+        except NameError:
+            # Annotation refers to a class that isn't defined yet
+            pass
 
+    def __new__(cls, *args, **kwargs):
         meta = get_param_meta(cls)
+        if not meta.resolved:
+            meta = resolve_param_meta(cls)
+        if (instance_type := meta.instance_type) is None:
+            instance_type = create_instance_type(cls)
 
-        definitions = {}
-        param_children = {}
-        for mro_cls in reversed(cls.__mro__):
-            if not is_parameters(mro_cls):
-                continue
-            meta = get_param_meta(mro_cls)
-            definitions.update(meta.definitions)
-            param_children.update(meta.child_parameters)
-
-        for name, value in definitions.items():
-            if value.default:
-                setattr(instance, name, value.default)  # Set value from default
-            else:
-                setattr(instance, name, None)
+        instance = object.__new__(instance_type)
+
+        for name, value in meta.defaults.items():
+            setattr(instance, name, value)
 
         # Instantiate child parameter groups
-        for name, type_ in param_children.items():
-            child = type_()
-            setattr(instance, name, child)
+        for name, type_ in meta.child_parameters.items():
+            setattr(instance, name, type_())
 
         return instance
 
+    def __reduce__(self):
+        # The generated instance type can't be found by name, rebuild from the
+        # declared class instead
+        meta = get_param_meta(self)
+        state = {name: getattr(self, name) for name in meta.instance_type.__slots__}
+        return _restore_parameters, (type(self).__mro__[1], state)
+
+
+def _restore_parameters(parameters_type: Type, state: dict[str, Any]) -> Parameters:
+    instance = parameters_type()
+    for name, value in state.items():
+        setattr(instance, name, value)
+    return instance
+
+
+def create_instance_type(parameters_type: Type) -> Type:
+    meta = resolve_param_meta(parameters_type)
+    slots = tuple(dict.fromkeys([*meta.definitions, *meta.child_parameters]))
+
+    meta.instance_type = ParametersType(
+        parameters_type.__name__,
+        (parameters_type,),
+        {
+            "__slots__": slots,
+            "__module__": parameters_type.__module__,
+            "__qualname__": parameters_type.__qualname__,
+            PARAMMETA: meta,
+        },
+    )
+    return meta.instance_type
+
+
+def resolve_param_meta(parameters: Any) -> ParameterMeta:
+    meta = get_param_meta(parameters)
+    if meta.resolved:
+        return meta
+
+    parameters_type = parameters if isinstance(parameters, type) else type(parameters)
+
+    # Collect all the attribute names, values, and types
+    annotations = get_type_hints(parameters_type)
+
+    for attr_name, definition in meta.definitions.items():
+        # If there's no type annotation, make the default a string
+        if isinstance(definition, Option) or isinstance(definition, Flag):
+            annotations.setdefault(attr_name, Optional[str])
+        elif isinstance(definition, Argument):
+            annotations.setdefault(attr_name, str)
+
+    # Save child parameter groups
+    child_parameters = {}
+    for attr_name, type_ in annotations.items():
+        if isinstance(type_, type) and issubclass(type_, Parameters):
+            child_parameters[attr_name] = type_
+
+    meta.annotations = annotations
+    meta.child_parameters = child_parameters
+    meta.resolved = True
+    setattr(parameters_type, "__annotations__", annotations)
+
+    return meta
+
 
 @dataclass(frozen=True)
 class FlatParameter:
@@ -120,6 +334,37 @@ class FlatParameter:
     parameter: Parameter
 
 
+def get_flat_parameters(parameters: Any) -> tuple[FlatParameter]:
+    meta = resolve_param_meta(parameters)
+    if meta.flat is not None:
+        return meta.flat
+
+    # Owners are attribute paths relative to the Parameters class
+    param_result = [
+        FlatParameter(
+            owner=(),
+            member_name=attr_name,
+            annotation=meta.annotations[attr_name],
+            parameter=definition,
+        )
+        for attr_name, definition in meta.definitions.items()
+    ]
+
+    for attr_name, child_type in meta.child_parameters.items():
+        for child in get_flat_parameters(child_type):
+            param_result.append(
+                FlatParameter(
+                    owner=(attr_name, *child.owner),
+                    member_name=child.member_name,
+                    annotation=child.annotation,
+                    parameter=child.parameter,
+                )
+            )
+
+    meta.flat = tuple(param_result)
+    return meta.flat
+
+
 def flatten_parameters(*parameters: Parameter) -> tuple[FlatParameter]:
     param_result = []
 
@@ -127,22 +372,39 @@ def flatten_parameters(*parameters: Parameter) -> tuple[FlatParameter]:
         if not is_parameters(parameter):
             continue
 
-        meta = get_param_meta(parameter)
-        annotations = get_type_hints(parameter)
-        for attr_name, definition in meta.definitions.items():
+        owners = {(): parameter}
+        for flat in get_flat_parameters(parameter):
+            if (owner := owners.get(flat.owner)) is None:
+                owner = parameter
+                for attr_name in flat.owner:
+                    owner = getattr(owner, attr_name)
+                owners[flat.owner] = owner
+
             param_result.append(
                 FlatParameter(
-                    owner=parameter,
-                    member_name=attr_name,
-                    annotation=annotations[attr_name],
-                    parameter=definition,
+                    owner=owner,
+                    member_name=flat.member_name,
+                    annotation=flat.annotation,
+                    parameter=flat.parameter,
                 )
             )
 
-        child_attr = [
-            getattr(parameter, attr_name) for attr_name in meta.child_parameters
-        ]
-        child_params = flatten_parameters(*child_attr)
-        param_result.extend(child_params)
-
     return tuple(param_result)
+
+
+def flatten_parameter_types(
+    parameters_type: Type, path: tuple[str, ...] = ()
+) -> tuple[FlatParameter]:
+    flat_parameters = get_flat_parameters(parameters_type)
+    if not path:
+        return flat_parameters
+
+    return tuple(
+        FlatParameter(
+            owner=path + flat.owner,
+            member_name=flat.member_name,
+            annotation=flat.annotation,
+            parameter=flat.parameter,
+        )
+        for flat in flat_parameters
+    )
@@ -1,14 +1,72 @@
-from typing import Optional, Type
+from itertools import chain
+from typing import Iterable, Iterator, Optional, Type
 import sys
 
-from .compiler import CompilerAction, CompilerArgument, CompilerCommand, CompilerOption, CompilerStore, CompilerStoreBool
+from .command import load_command
+from .compiler import CompilerAction, CompilerArgument, CompilerCommand, CompilerOption
+from .suggest import did_you_mean
+
+
+class UnknownOptionError(Exception):
+    def __init__(
+        self, option: str, suggestions: list[str] = None, message: str = None
+    ):
+        self.option = option
+        self.suggestions = suggestions or []
+        if not message:
+            message = f"Unknown option: {option}{did_you_mean(self.suggestions)}"
+        super().__init__(message)
+
+
+class UnknownCommandError(Exception):
+    def __init__(
+        self, command: str, suggestions: list[str] = None, message: str = None
+    ):
+        self.command = command
+        self.suggestions = suggestions or []
+        if not message:
+            message = f"Unknown command: {command}{did_you_mean(self.suggestions)}"
+        super().__init__(message)
+
+
+class OptionValueError(Exception):
+    def __init__(self, option: str, message: str = None):
+        self.option = option
+        if not message:
+            message = f"Option {option} does not take a value"
+        super().__init__(message)
+
+
+# Values of a "*" or "+" argument converted at a time
+VALUES_CHUNK_SIZE = 4096
+
+
+class ArgumentCountError(Exception):
+    def __init__(self, argument: str, expected: int, given: int, message: str = None):
+        self.argument = argument
+        self.expected = expected
+        self.given = given
+        if not message:
+            message = f"Argument {argument} takes {expected} values, {given} given"
+        super().__init__(message)
+
+
+def is_option_like(arg: str) -> bool:
+    # "-" and negative numbers are values
+    return arg.startswith("-") and len(arg) > 1 and not arg[1].isdigit()
 
 
 class Parser:
-    def __init__(self, compiler_command: CompilerCommand, args: list[str]):
+    def __init__(self, compiler_command: CompilerCommand, args: Iterable[str]):
         self.compiler_command = compiler_command
+        # Arguments can be a lazy stream, e.g. read from a response file, which
+        # is only ever consumed through this iterator
+        self._streamed = not isinstance(args, (list, tuple))
         self._args_iter = iter(args)
         self.current_arg = None
+        self._compiler_args_iter = iter(compiler_command.arguments)
+        self._repeat_argument = None
+        self.end_opts = False
 
     def next_arg(self) -> str:
         try:
@@ -17,15 +75,47 @@ class Parser:
             self.current_arg = None
 
     def parse_action(self, action: CompilerAction):
-        if isinstance(action, CompilerStore):
+        if (seen := self.compiler_command.seen) is not None:
+            self.compiler_command.seen = seen | action.mask
+        if action.takes_value:
             value = self.current_arg
-            action.set(value)
+            action.set(self.compiler_command.owners, value)
             self.next_arg()
-        elif isinstance(action, CompilerStoreBool):
-            action.set()
+        else:
+            action.set(self.compiler_command.owners)
 
     def parse_argument(self, argument: CompilerArgument):
-        self.parse_action(argument.action)
+        nargs = argument.nargs
+        if nargs is None or nargs == "?":
+            self.parse_action(argument.action)
+        elif isinstance(nargs, int):
+            values = self.collect_values(nargs)
+            if len(values) < nargs:
+                name = argument.action.member_name
+                raise ArgumentCountError(name, nargs, len(values))
+            self.parse_values(argument.action, values)
+        else:
+            # Extended chunk by chunk so a long stream of values is converted
+            # without holding all of its strings
+            while values := self.collect_values(VALUES_CHUNK_SIZE):
+                self.parse_values(argument.action, values)
+
+    def parse_values(self, action: CompilerAction, values: list[str]):
+        if (seen := self.compiler_command.seen) is not None:
+            self.compiler_command.seen = seen | action.mask
+        action.extend(self.compiler_command.owners, values)
+
+    def collect_values(self, limit: int) -> list[str]:
+        # Consecutive values up to the next option, or all of them after "--"
+        values = []
+        arg = self.current_arg
+        while arg is not None and len(values) < limit:
+            if not self.end_opts and arg.startswith("-") and arg != "-":
+                break
+            values.append(arg)
+            arg = next(self._args_iter, None)
+        self.current_arg = arg
+        return values
 
     def parse_option(self, option: CompilerOption):
         if isinstance(option.child, CompilerAction):
@@ -33,35 +123,110 @@ class Parser:
         elif isinstance(option.child, CompilerArgument):
             self.parse_argument(option.child)
 
+    def parse_long_option(self) -> bool:
+        # --name, --name=value, or an unambiguous abbreviation of either
+        arg = self.current_arg
+        option, end = self.compiler_command.option_trie.match(arg)
+        if option is None:
+            return False
+
+        if end < len(arg):
+            if not option.takes_value:
+                raise OptionValueError(arg[:end])
+            self.current_arg = arg[end + 1 :]
+        else:
+            self.next_arg()
+        self.parse_option(option)
+
+        return True
+
+    def parse_short_options(self) -> bool:
+        # Clustered short options -abc, the first one taking a value consumes
+        # the rest of the cluster or the next argument
+        arg = self.current_arg
+        options = self.compiler_command.options
+        if len(arg) < 3 or arg[1] == "-" or f"-{arg[1]}" not in options:
+            return False
+
+        for index in range(1, len(arg)):
+            name = f"-{arg[index]}"
+            if (option := options.get(name)) is None:
+                raise UnknownOptionError(name)
+
+            if option.takes_value:
+                if rest := arg[index + 1 :]:
+                    self.current_arg = rest
+                else:
+                    self.next_arg()
+                self.parse_option(option)
+                return True
+
+            self.parse_option(option)
+
+        self.next_arg()
+        return True
+
+    def next_positional(self) -> Optional[CompilerArgument]:
+        if self._repeat_argument is not None:
+            return self._repeat_argument
+
+        argument = next(self._compiler_args_iter, None)
+        if argument is not None and argument.repeats:
+            self._repeat_argument = argument
+        return argument
+
     def parse_command(self):
-        end_opts = False
-        iter_compiler_arg = iter(self.compiler_command.arguments)
-        next_command = None
         self.next_arg()
+        return self.parse_remaining()
+
+    def parse_remaining(self):
+        next_command = None
 
         while self.current_arg:
             if self.current_arg == "--":
-                end_opts = True
+                self.end_opts = True
                 self.next_arg()
 
-            if end_opts:
-                for argument in iter_compiler_arg:
+            if self.end_opts:
+                while self.current_arg is not None:
+                    if (argument := self.next_positional()) is None:
+                        break
                     self.parse_argument(argument)
                 break
 
             if subcommand := self.compiler_command.subcommands.get(self.current_arg):
                 self.next_arg()
-                next_command = subcommand
+                next_command = load_command(subcommand)
                 break
             elif option := self.compiler_command.options.get(self.current_arg):
                 self.next_arg()
                 self.parse_option(option)
-            else:
-                argument = next(iter_compiler_arg)
+            elif self.current_arg.startswith("--") and self.parse_long_option():
+                pass
+            elif self.current_arg.startswith("-") and self.parse_short_options():
+                pass
+            elif is_option_like(self.current_arg):
+                name = self.current_arg.partition("=")[0]
+                suggestions = self.compiler_command.option_names.suggest(name)
+                raise UnknownOptionError(name, suggestions)
+            elif argument := self.next_positional():
                 self.parse_argument(argument)
+            elif self.compiler_command.subcommands:
+                name = self.current_arg
+                suggestions = self.compiler_command.command_names.suggest(name)
+                raise UnknownCommandError(name, suggestions)
+            else:
+                # Out of positional arguments, leave the rest to the caller
+                break
 
             continue
 
+        if self._streamed and next_command is not None:
+            # The subcommand keeps reading from the same stream
+            if self.current_arg:
+                return next_command, chain((self.current_arg,), self._args_iter)
+            return next_command, self._args_iter
+
         last_args = [arg for arg in self._args_iter]
         if self.current_arg:
             remaining_args = [self.current_arg] + last_args
@@ -72,7 +237,24 @@ class Parser:
 
 
     @classmethod
-    def parse_args(cls, compiler_command: CompilerCommand, args: list[str] = None) -> tuple[Optional[Type], list[str]]:
+    def resume(
+        cls,
+        compiler_command: CompilerCommand,
+        args_iter: Iterator[str],
+        current_arg: Optional[str],
+        position: int,
+        streamed: bool,
+    ) -> tuple[Optional[Type], Iterable[str]]:
+        # Continues where a specialized parser stopped, at current_arg with the
+        # positional arguments before position already parsed
+        parser = cls(compiler_command, args_iter)
+        parser._streamed = streamed
+        parser.current_arg = current_arg
+        parser._compiler_args_iter = iter(compiler_command.arguments[position:])
+        return parser.parse_remaining()
+
+    @classmethod
+    def parse_args(cls, compiler_command: CompilerCommand, args: Iterable[str] = None) -> tuple[Optional[Type], Iterable[str]]:
         if args is None:
             args = sys.argv[1:]
 
@@ -0,0 +1,99 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Union
+
+
+class UnknownProfilerError(Exception):
+    def __init__(self, profiler: str, message: str = None):
+        self.profiler = profiler
+        if not message:
+            expected = ", ".join(PROFILERS)
+            message = f"Unknown profiler {profiler}, expected one of: {expected}"
+        super().__init__(message)
+
+
+class SamplingProfiler:
+    # Samples the stack of one thread from a background thread and writes
+    # collapsed stacks ("outer;inner count") as used by flame graph tools
+
+    def __init__(self, thread_id: int = None, interval: float = 0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Union[str, os.PathLike]):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def _cprofile(path: Union[str, os.PathLike]) -> Iterator[None]:
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+
+
+@contextmanager
+def _sampling(path: Union[str, os.PathLike]) -> Iterator[None]:
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        profiler.write(path)
+
+
+PROFILERS = {"cprofile": _cprofile, "sample": _sampling}
+
+
+def _profiler(profiler: str, path: Union[str, os.PathLike]):
+    if profiler not in PROFILERS:
+        raise UnknownProfilerError(profiler)
+    return PROFILERS[profiler](path)
+
+
+def run_profiled(
+    func: Callable[[], Any], path: Union[str, os.PathLike], profiler: str = "cprofile"
+) -> Any:
+    with _profiler(profiler, path):
+        return func()
+
+
+async def run_profiled_async(
+    func: Callable[[], Awaitable[Any]],
+    path: Union[str, os.PathLike],
+    profiler: str = "cprofile",
+) -> Any:
+    # Profiles the running event loop's thread while the coroutine is awaited
+    with _profiler(profiler, path):
+        return await func()
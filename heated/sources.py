@@ -0,0 +1,178 @@
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Union
+
+from .compiler import CompilerCommand
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+CONFIG_CACHE_VERSION = 1
+
+# Parsed config files by path, with the modification time and size they were
+# parsed at
+_parsed_configs: dict[str, tuple[int, int, dict[str, Any]]] = {}
+
+_MISSING = object()
+
+
+class ConfigError(Exception):
+    def __init__(self, path: str, message: str = None):
+        self.path = path
+        if not message:
+            message = f"Can't read config file {path}"
+        super().__init__(message)
+
+
+def parse_config(path: str) -> dict[str, Any]:
+    if path.endswith(".json"):
+        with open(path, "rb") as f:
+            return json.load(f)
+
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ConfigError(path, f"Reading {path} needs tomli on Python < 3.11")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+
+    raise ConfigError(path, f"Unknown config file type {path}, expected toml or json")
+
+
+class ConfigCache:
+    # Parsed config files kept between invocations, reparsed when the file's
+    # modification time or size changes
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+        self._entries: Optional[dict[str, tuple[int, int, dict[str, Any]]]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> dict[str, tuple[int, int, dict[str, Any]]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> dict[str, tuple[int, int, dict[str, Any]]]:
+        try:
+            with open(self.path, "rb") as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return {}
+
+        if version != CONFIG_CACHE_VERSION:
+            return {}
+        return entries
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[dict[str, Any]]:
+        entry = self.entries.get(path)
+        if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+            return None
+        return entry[2]
+
+    def put(self, path: str, stat: os.stat_result, config: dict[str, Any]):
+        self.entries[path] = (stat.st_mtime_ns, stat.st_size, config)
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump(
+                (CONFIG_CACHE_VERSION, self.entries), f, pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+
+def load_config(
+    path: Union[str, os.PathLike], cache: ConfigCache = None
+) -> Optional[dict[str, Any]]:
+    # None when the file doesn't exist, config files are optional
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    parsed = _parsed_configs.get(path)
+    if parsed is not None and parsed[:2] == (stat.st_mtime_ns, stat.st_size):
+        return parsed[2]
+
+    config = cache.get(path, stat) if cache is not None else None
+    if config is None:
+        try:
+            config = parse_config(path)
+        except (OSError, ValueError) as error:
+            raise ConfigError(path, f"Can't read config file {path}: {error}")
+        if cache is not None:
+            cache.put(path, stat, config)
+
+    _parsed_configs[path] = (stat.st_mtime_ns, stat.st_size, config)
+    return config
+
+
+def lookup(config: dict[str, Any], key: tuple[str, ...]) -> Any:
+    value = config
+    for part in key:
+        if not isinstance(value, dict):
+            return _MISSING
+        if (value := value.get(part, _MISSING)) is _MISSING:
+            return _MISSING
+    return value
+
+
+def config_value(configs: list[dict[str, Any]], key: tuple[str, ...]) -> Any:
+    # The last file wins
+    for config in reversed(configs):
+        if (value := lookup(config, key)) is not _MISSING:
+            return value
+    return _MISSING
+
+
+class Sources:
+    # Values for parameters that aren't on the command line, from the
+    # environment first and then the config files
+    def __init__(
+        self,
+        config_files: Iterable[Union[str, os.PathLike]] = (),
+        environ: Mapping[str, str] = None,
+        cache: ConfigCache = None,
+    ):
+        self.config_files = list(config_files)
+        self.environ = os.environ if environ is None else environ
+        self.cache = cache
+
+    def load_configs(self) -> list[dict[str, Any]]:
+        # One stat per file, a file is only parsed again once it changed
+        configs = [load_config(path, self.cache) for path in self.config_files]
+        if self.cache is not None:
+            self.cache.save()
+        return [config for config in configs if config is not None]
+
+    def apply(self, compiled: CompilerCommand):
+        # Runs before the command line is parsed, so it overrides these values.
+        # Config files are only read once a parameter refers to a config key
+        configs = None
+        for binding in compiled.sources:
+            value = _MISSING
+            if binding.env is not None:
+                value = self.environ.get(binding.env, _MISSING)
+            if value is _MISSING and binding.config is not None:
+                if configs is None:
+                    configs = self.load_configs()
+                value = config_value(configs, binding.config)
+            if value is not _MISSING:
+                binding.apply(compiled.owners, value)
+                if compiled.seen is not None:
+                    compiled.seen |= binding.action.mask
@@ -0,0 +1,87 @@
+from collections import Counter
+from typing import Iterable, Optional
+
+
+# Names that share fewer n-grams with the unknown one aren't compared at all
+MIN_SIMILARITY = 0.4
+# Edits allowed per character of the unknown name
+MAX_EDITS_PER_CHAR = 1 / 3
+SUGGESTION_LIMIT = 3
+
+
+def ngrams(name: str, n: int = 2) -> set[str]:
+    # Dashes are left out, every long option shares them. The ends are marked
+    # so the first and last characters count too. Bigrams, as a typo in a short
+    # name leaves it few trigrams in common
+    padded = f"^{name.lstrip('-')}$"
+    return {padded[index : index + n] for index in range(max(1, len(padded) - n + 1))}
+
+
+def edit_distance(a: str, b: str) -> int:
+    # Optimal string alignment, swapping two neighbouring characters is one edit
+    before_previous: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+class NgramIndex:
+    # Fuzzy lookup over option or subcommand names. Only the names sharing an
+    # n-gram with the unknown one are compared, not every name
+    __slots__ = ("names", "_postings", "_sizes")
+
+    def __init__(self, names: Iterable[str]):
+        # Usually the plan's own dict of names, only read once a name is
+        # looked up
+        self.names = names
+        self._postings: Optional[dict[str, list[str]]] = None
+        # Number of n-grams of each name
+        self._sizes: dict[str, int] = {}
+
+    @property
+    def postings(self) -> dict[str, list[str]]:
+        if self._postings is None:
+            postings: dict[str, list[str]] = {}
+            for name in self.names:
+                grams = ngrams(name)
+                self._sizes[name] = len(grams)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(name)
+            self._postings = postings
+        return self._postings
+
+    def suggest(self, name: str, limit: int = SUGGESTION_LIMIT) -> list[str]:
+        grams = ngrams(name)
+        postings = self.postings
+        shared = Counter()
+        for gram in grams:
+            shared.update(postings.get(gram, ()))
+
+        max_distance = max(1, int(len(name.lstrip("-")) * MAX_EDITS_PER_CHAR))
+        ranked = []
+        for candidate, count in shared.items():
+            # Dice coefficient of the two n-gram sets
+            if 2 * count / (len(grams) + self._sizes[candidate]) < MIN_SIMILARITY:
+                continue
+            if (distance := edit_distance(name, candidate)) <= max_distance:
+                ranked.append((distance, candidate))
+        return [candidate for _, candidate in sorted(ranked)[:limit]]
+
+
+def did_you_mean(suggestions: list[str]) -> str:
+    if not suggestions:
+        return ""
+    if len(suggestions) == 1:
+        return f", did you mean {suggestions[0]}?"
+    return f", did you mean one of {', '.join(suggestions)}?"
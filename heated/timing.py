@@ -0,0 +1,59 @@
+import sys
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+
+TIMINGS_ENV = "HEATED_TIMINGS"
+
+
+@dataclass(frozen=True)
+class PhaseTiming:
+    command: str
+    phase: str
+    seconds: float
+    # Net allocated memory blocks, only when allocations are traced
+    allocations: Optional[int] = None
+
+
+class PhaseRecorder:
+    def __init__(self, timings: list[PhaseTiming], trace_allocations: bool = False):
+        self.timings = timings
+        self.trace_allocations = trace_allocations
+
+    def start(self) -> tuple[float, int]:
+        if self.trace_allocations:
+            return perf_counter(), sys.getallocatedblocks()
+        return perf_counter(), 0
+
+    def stop(self, command: str, phase: str, started: tuple[float, int]):
+        seconds = perf_counter() - started[0]
+        allocations = None
+        if self.trace_allocations:
+            allocations = sys.getallocatedblocks() - started[1]
+        self.timings.append(PhaseTiming(command, phase, seconds, allocations))
+
+
+class NullRecorder:
+    # Stands in for PhaseRecorder when nothing will read the timings
+    def start(self) -> None:
+        return None
+
+    def stop(self, command: str, phase: str, started: None):
+        pass
+
+
+NULL_RECORDER = NullRecorder()
+
+
+def format_timings(timings: list[PhaseTiming]) -> str:
+    lines = []
+    for timing in timings:
+        line = f"{timing.command:20} {timing.phase:12} {timing.seconds * 1000:10.3f} ms"
+        if timing.allocations is not None:
+            line += f" {timing.allocations:8} blocks"
+        lines.append(line)
+
+    total = sum(timing.seconds for timing in timings)
+    lines.append(f"{'total':33} {total * 1000:10.3f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,386 @@
+import asyncio
+import sys
+
+import pytest
+
+from heated.app import App, ParseResult, RemainingArguments
+from heated.command import Command
+from heated.compiler import ParameterGroupError, compile_command_type
+from heated.context import Context
+from heated.parser import UnknownCommandError
+from heated.parameters import (
+    Argument,
+    AtLeastOne,
+    Exclusive,
+    Flag,
+    Option,
+    Parameters,
+    ParametersValidationError,
+    Required,
+    validator,
+)
+
+
+class Person(Parameters):
+    name: str = Argument("NAME")
+    age: str = Option("--age")
+
+
+class Child(Command):
+    person: Person
+
+
+class Main(Command):
+    person: Person
+    child: Child
+
+
+def test_parse():
+    app = App(Main)
+    result = app.parse(["Mike", "--age", "42"])
+
+    assert 1 == len(result)
+    assert isinstance(result[0], Main)
+    assert "Mike" == result[0].person.name
+    assert "42" == result[0].person.age
+
+
+def test_parse_subcommand_chain():
+    app = App(Main)
+    result = app.parse(["Mike", "child", "Kara"])
+
+    assert [Main, Child] == [type(command) for command in result]
+    assert "Kara" == result[1].person.name
+    assert result[0].context is result[1].context
+
+
+def test_parse_remaining_arguments():
+    app = App(Child)
+
+    with pytest.raises(RemainingArguments):
+        app.parse(["Mike", "Kara"])
+
+
+def test_parse_unknown_command():
+    app = App(Main)
+
+    with pytest.raises(UnknownCommandError) as error:
+        app.parse(["Mike", "chlid"])
+    assert ["child"] == error.value.suggestions
+    assert "Unknown command: chlid, did you mean child?" == str(error.value)
+
+
+def test_parse_is_reentrant():
+    app = App(Main)
+    first = app.parse(["Mike"])
+    second = app.parse(["Kara"])
+
+    assert "Mike" == first[0].person.name
+    assert "Kara" == second[0].person.name
+    assert first[0].context is not second[0].context
+
+
+def test_parse_many():
+    app = App(Main)
+    result = list(app.parse_many([["Mike"], ["Mike", "Kara"], ["Kara", "child"]]))
+
+    assert 3 == len(result)
+    assert all(isinstance(item, ParseResult) for item in result)
+    assert "Mike" == result[0].commands[0].person.name
+    assert isinstance(result[1].error, UnknownCommandError)
+    assert [] == result[1].commands
+    assert ["Kara", "child"] == result[2].args
+    assert None is result[2].error
+
+
+def test_run(monkeypatch):
+    invoked = []
+
+    class Invoked(Command):
+        person: Person
+
+        def invoke(self):
+            invoked.append(self.person.name)
+            self.context.exit_code = 3
+
+    monkeypatch.setattr(sys, "argv", ["prog", "Mike"])
+    app = App(Invoked, context=Context())
+
+    with pytest.raises(SystemExit) as exit_info:
+        app.run()
+
+    assert ["Mike"] == invoked
+    assert 3 == exit_info.value.code
+
+
+def test_parse_records_timings():
+    context = Context()
+    App(Main, trace_allocations=True).parse(["Mike", "child", "Kara"], context)
+
+    assert [
+        ("main", "instantiate"),
+        ("main", "compile"),
+        ("main", "parse"),
+        ("child", "instantiate"),
+        ("child", "compile"),
+        ("child", "parse"),
+    ] == [(timing.command, timing.phase) for timing in context.timings]
+
+
+def test_parse_skips_timings_by_default(monkeypatch):
+    monkeypatch.delenv("HEATED_TIMINGS", raising=False)
+    context = Context()
+    App(Main).parse(["Mike", "child", "Kara"], context)
+
+    assert [] == context.timings
+
+
+def test_execute_timing_hooks():
+    contexts = []
+    app = App(Main, timing_hooks=[contexts.append])
+
+    app.execute(["Mike"])
+
+    assert 1 == len(contexts)
+    assert ("main", "invoke") == (
+        contexts[0].timings[-1].command,
+        contexts[0].timings[-1].phase,
+    )
+
+
+def test_execute_prints_timings(monkeypatch, capsys):
+    monkeypatch.setenv("HEATED_TIMINGS", "alloc")
+    app = App(Main)
+
+    app.execute(["Mike"])
+
+    stderr = capsys.readouterr().err
+    assert "invoke" in stderr
+    assert "blocks" in stderr
+    assert "total" in stderr
+
+
+def test_run_profiled(monkeypatch, tmp_path):
+    profile_path = tmp_path / "run.prof"
+    monkeypatch.setenv("HEATED_PROFILE", str(profile_path))
+    monkeypatch.setattr(sys, "argv", ["prog", "Mike"])
+
+    with pytest.raises(SystemExit):
+        App(Main).run()
+
+    assert profile_path.exists()
+
+
+class Session:
+    def __init__(self, events):
+        self.events = events
+
+    async def __aenter__(self):
+        self.events.append("open")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.events.append("close")
+
+
+def make_async_chain(events):
+    class AsyncChild(Command, name="child"):
+        person: Person
+
+        async def invoke(self):
+            await asyncio.sleep(0)
+            events.append(("child", self.context.resources["session"]))
+            self.context.exit_code = 5
+
+    class AsyncMain(Command):
+        child: AsyncChild
+
+        async def invoke(self):
+            session = await self.context.enter_async_context(Session(events))
+            self.context.resources["session"] = session
+
+    return AsyncMain
+
+
+def test_execute_async_chain():
+    events = []
+    app = App(make_async_chain(events))
+
+    result = asyncio.run(app.execute_async(["child", "Kara"]))
+
+    assert 5 == result
+    assert "open" == events[0]
+    assert "child" == events[1][0]
+    assert isinstance(events[1][1], Session)
+    assert "close" == events[2]
+
+
+def test_execute_runs_async_commands():
+    events = []
+    app = App(make_async_chain(events))
+
+    result = app.execute(["child", "Kara"])
+
+    assert 5 == result
+    assert ["open", "close"] == [events[0], events[2]]
+
+
+def test_execute_async_mixed_commands():
+    invoked = []
+
+    class SyncChild(Command, name="child"):
+        def invoke(self):
+            invoked.append("child")
+
+    class AsyncMain(Command):
+        child: SyncChild
+
+        async def invoke(self):
+            invoked.append("main")
+
+    result = asyncio.run(App(AsyncMain).execute_async(["child"]))
+
+    assert 0 == result
+    assert ["main", "child"] == invoked
+
+
+def test_execute_async_closes_resources_on_error():
+    events = []
+
+    class Broken(Command):
+        async def invoke(self):
+            await self.context.enter_async_context(Session(events))
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(App(Broken).execute_async([]))
+
+    assert ["open", "close"] == events
+
+
+def test_run_async(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", "child", "Kara"])
+    app = App(make_async_chain([]))
+
+    with pytest.raises(SystemExit) as exit_info:
+        asyncio.run(app.run_async())
+
+    assert 5 == exit_info.value.code
+
+
+def test_run_async_profiled(monkeypatch, tmp_path):
+    profile_path = tmp_path / "run.prof"
+    monkeypatch.setenv("HEATED_PROFILE", str(profile_path))
+    monkeypatch.setattr(sys, "argv", ["prog", "child", "Kara"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        asyncio.run(App(make_async_chain([])).run_async())
+
+    assert 5 == exit_info.value.code
+    assert profile_path.exists()
+
+
+def test_parse_response_files(tmp_path):
+    path = tmp_path / "chain.args"
+    path.write_text("Mike\nchild\n")
+    context = Context()
+
+    main, child = App(Main, response_files=True).parse([f"@{path}", "Kara"], context)
+
+    assert "Mike" == main.person.name
+    assert "Kara" == child.person.name
+
+
+class Range(Parameters):
+    start: int = Option("--start", default=0)
+    end: int = Option("--end", default=10)
+
+    @validator
+    def ordered(start, end):
+        return start <= end
+
+
+class Limits(Parameters):
+    # Invalid by default, only validated once it's given a value
+    low: int = Option("--low", default=5)
+    high: int = Option("--high", default=1)
+
+    @validator
+    def ordered(low, high):
+        return low <= high
+
+
+class Ranged(Command):
+    range: Range
+    limits: Limits
+
+
+@pytest.mark.parametrize("specialize", [False, True])
+def test_parse_validates_touched_groups(specialize):
+    app = App(Ranged, specialize=specialize)
+
+    app.parse(["--start", "3"])
+    with pytest.raises(ParametersValidationError):
+        app.parse(["--start", "11"])
+    with pytest.raises(ParametersValidationError):
+        app.parse(["--low", "4"])
+
+
+def test_compiled_validated_groups():
+    compiled = compile_command_type(Ranged)
+
+    assert frozenset({0, 1}) == compiled.validated
+    assert None is compile_command_type(Main).bind(Main(context=None)).seen
+
+
+class Output(Parameters):
+    json: bool = Flag("--json", "-j")
+    yaml: bool = Flag("--yaml")
+    path: str = Option("--path", "-p")
+    user: str = Option("--user", env="TEST_GROUPS_USER")
+    token: str = Option("--token")
+
+    formats = Exclusive("json", "yaml")
+    destination = AtLeastOne("path", "json")
+    credentials = Required("user", "token")
+
+
+class Export(Command):
+    output: Output
+
+
+@pytest.mark.parametrize("specialize", [False, True])
+def test_parse_checks_groups(specialize):
+    app = App(Export, specialize=specialize)
+
+    app.parse(["-p", "out", "--user", "kara", "--token", "x"])
+    with pytest.raises(ParameterGroupError) as error:
+        app.parse(["-j", "--yaml", "--user", "kara", "--token", "x"])
+    assert ["--json", "--yaml"] == error.value.names
+    assert "Parameters can't be used together: --json, --yaml" == str(error.value)
+
+    with pytest.raises(ParameterGroupError) as error:
+        app.parse(["--user", "kara", "--token", "x"])
+    assert ["--path", "--json"] == error.value.names
+
+    with pytest.raises(ParameterGroupError) as error:
+        app.parse(["--path", "out", "--token", "x"])
+    assert "Missing required parameters: --user" == str(error.value)
+
+
+def test_parse_groups_count_sources(monkeypatch):
+    monkeypatch.setenv("TEST_GROUPS_USER", "kara")
+
+    (export,) = App(Export).parse(["--path", "out", "--token", "x"])
+
+    assert "kara" == export.output.user
+
+
+def test_compiled_groups():
+    compiled = compile_command_type(Export)
+    formats, destination, credentials = compiled.constraints
+
+    assert [0b11111] == compiled.owner_masks
+    assert 0b00011 == formats.mask
+    assert {0b00100: "--path", 0b00001: "--json"} == destination.names
+    assert 0 == compiled.bind(Export(context=None)).seen
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from heated.argfiles import (
+    ResponseFileError,
+    expand_response_files,
+    open_arguments,
+    read_arguments,
+)
+
+
+def test_read_arguments_lines():
+    stream = io.StringIO("--name\nMike\n\nKara\r\n")
+
+    assert ["--name", "Mike", "Kara"] == list(read_arguments(stream))
+
+
+def test_read_arguments_separator(monkeypatch):
+    monkeypatch.setattr("heated.argfiles.CHUNK_SIZE", 3)
+    stream = io.StringIO("a b\0with\nnewline\0last")
+
+    assert ["a b", "with\nnewline", "last"] == list(read_arguments(stream, "\0"))
+
+
+def test_read_arguments_is_lazy():
+    stream = io.StringIO("first\nsecond\n")
+    arguments = read_arguments(stream)
+
+    assert "first" == next(arguments)
+    assert "second\n" == stream.read()
+
+
+def test_expand_response_files(tmp_path):
+    nested = tmp_path / "nested.args"
+    nested.write_text("Kara\n")
+    main = tmp_path / "main.args"
+    main.write_text(f"--name\nMike\n@{nested}\n")
+
+    result = expand_response_files(["@", f"@{main}", "last"])
+
+    assert ["@", "--name", "Mike", "Kara", "last"] == list(result)
+
+
+def test_expand_response_files_stdin(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO("a\nb\n"))
+
+    assert ["a", "b"] == list(expand_response_files(["@-"]))
+
+
+def test_expand_response_files_cycle(tmp_path):
+    path = tmp_path / "loop.args"
+    path.write_text(f"@{path}\n")
+
+    with pytest.raises(ResponseFileError):
+        list(expand_response_files([f"@{path}"]))
+
+
+def test_open_arguments(tmp_path):
+    path = tmp_path / "paths.txt"
+    path.write_text("a.txt\nb.txt\n")
+
+    assert ["a.txt", "b.txt"] == list(open_arguments(path))
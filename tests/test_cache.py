@@ -0,0 +1,165 @@
+import importlib
+import os
+import textwrap
+
+import pytest
+
+from heated.cache import GrammarCache, fingerprint
+from heated.compiler import COMPILERCACHE, compile_command_type
+from heated.help import HELPCACHE, help_text
+
+
+MODULE_SOURCE = textwrap.dedent(
+    """
+    from heated.command import Command
+    from heated.parameters import Argument, Option, Parameters
+
+
+    class Person(Parameters):
+        name: str = Argument("NAME")
+        age: int = Option("--age")
+
+
+    class Child(Command):
+        ...
+
+
+    class Main(Command):
+        person: Person
+        child: Child
+    """
+)
+
+
+@pytest.fixture
+def cli_module(tmp_path, monkeypatch):
+    module_path = tmp_path / "cached_cli.py"
+    module_path.write_text(MODULE_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("cached_cli")
+    yield module
+    monkeypatch.delitem(importlib.sys.modules, "cached_cli")
+
+
+def test_cache_round_trip(cli_module, tmp_path):
+    cache_path = tmp_path / "grammar.cache"
+    cache = GrammarCache(cache_path)
+    compiled = compile_command_type(cli_module.Main, cache)
+    cache.save()
+
+    result = GrammarCache(cache_path).get(cli_module.Main)
+
+    assert cache_path.exists()
+    assert compiled.options.keys() == result.options.keys()
+    assert cli_module.Child is result.subcommands["child"]
+    assert compiled.owner_paths == result.owner_paths
+
+
+def test_cache_used_by_compile(cli_module, tmp_path):
+    cache_path = tmp_path / "grammar.cache"
+    cache = GrammarCache(cache_path)
+    compile_command_type(cli_module.Main, cache)
+    cache.save()
+    delattr(cli_module.Main, COMPILERCACHE)
+
+    cache = GrammarCache(cache_path)
+    result = compile_command_type(cli_module.Main, cache)
+
+    assert result is getattr(cli_module.Main, COMPILERCACHE)
+    assert "--age" in result.options
+
+
+def test_cache_help_text(cli_module, tmp_path):
+    cache_path = tmp_path / "grammar.cache"
+    cache = GrammarCache(cache_path)
+    text = help_text(cli_module.Main, cache)
+    cache.save()
+    delattr(cli_module.Main, HELPCACHE)
+
+    assert text == GrammarCache(cache_path).get_help(cli_module.Main)
+    assert None is GrammarCache(cache_path).get(cli_module.Main)
+
+
+def test_cache_stale_after_source_change(cli_module, tmp_path):
+    cache_path = tmp_path / "grammar.cache"
+    cache = GrammarCache(cache_path)
+    compile_command_type(cli_module.Main, cache)
+    cache.save()
+
+    stat = os.stat(cli_module.__file__)
+    os.utime(cli_module.__file__, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert None is GrammarCache(cache_path).get(cli_module.Main)
+
+
+def test_cache_missing_file(cli_module, tmp_path):
+    cache = GrammarCache(tmp_path / "missing.cache")
+
+    assert None is cache.get(cli_module.Main)
+
+
+def test_cache_corrupt_file(cli_module, tmp_path):
+    cache_path = tmp_path / "grammar.cache"
+    cache_path.write_bytes(b"not a pickle")
+
+    assert None is GrammarCache(cache_path).get(cli_module.Main)
+
+
+def test_cache_skips_local_classes(tmp_path):
+    from heated.command import Command
+
+    class Child(Command):
+        ...
+
+    class Main(Command):
+        child: Child
+
+    cache = GrammarCache(tmp_path / "grammar.cache")
+    compile_command_type(Main, cache)
+    cache.save()
+
+    assert not (tmp_path / "grammar.cache").exists()
+
+
+def test_fingerprint_includes_modules(cli_module):
+    result = fingerprint(cli_module.Main)
+
+    assert cli_module.__file__ in {filename for filename, _, _ in result}
+
+
+def test_cache_stale_after_base_parameters_change(tmp_path, monkeypatch):
+    (tmp_path / "cached_base.py").write_text(
+        "from heated.parameters import Option, Parameters\n\n\n"
+        "class Base(Parameters):\n"
+        "    a: str = Option('--a')\n"
+    )
+    (tmp_path / "cached_command.py").write_text(
+        "from heated.command import Command\n"
+        "from heated.parameters import Option\n"
+        "from cached_base import Base\n\n\n"
+        "class Params(Base):\n"
+        "    b: str = Option('--b')\n\n\n"
+        "class Main(Command):\n"
+        "    params: Params\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("cached_command")
+    cache_path = tmp_path / "grammar.cache"
+    cache = GrammarCache(cache_path)
+    compile_command_type(module.Main, cache)
+    cache.save()
+
+    base_file = importlib.sys.modules["cached_base"].__file__
+    stat = os.stat(base_file)
+    os.utime(base_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert None is GrammarCache(cache_path).get(module.Main)
+    monkeypatch.delitem(importlib.sys.modules, "cached_command")
+    monkeypatch.delitem(importlib.sys.modules, "cached_base")
+
+
+def test_fingerprint_includes_heated_modules(cli_module):
+    filenames = {filename for filename, _, _ in fingerprint(cli_module.Main)}
+
+    for module_name in ["heated.compiler", "heated.parameters", "heated.command"]:
+        assert importlib.sys.modules[module_name].__file__ in filenames
@@ -0,0 +1,105 @@
+import pytest
+
+from heated.app import App
+from heated.codegen import SPECIALIZEDCACHE, generate_parser_source, specialized_parser
+from heated.command import Command
+from heated.compiler import compile_command, compile_command_type
+from heated.parameters import Argument, Flag, Option, Parameters
+from heated.parser import Parser
+
+
+class Inner(Parameters):
+    level: int = Option("--level", "-l", default=0)
+    tags: list[str] = Option("-t", "--tag", action="append")
+
+
+class Outer(Parameters):
+    name: str = Argument("NAME")
+    age: int = Argument("AGE", default=0)
+    files: list[str] = Argument("FILES", nargs="*")
+    alive: bool = Flag("--alive", "-a")
+    quiet: bool = Flag("--quiet", "-q")
+    verbose: int = Flag("-v", action="count")
+    inner: Inner
+
+
+class Child(Command):
+    outer: Outer
+
+
+class Main(Command):
+    outer: Outer
+    child: Child
+
+
+ARGS = [
+    [],
+    ["Mike"],
+    ["Mike", "42", "a", "b", "-v", "c"],
+    ["--alive", "-l", "3", "Mike", "-t", "x", "--tag", "y"],
+    ["Mike", "--level=4", "--al", "-aqv", "-vv"],
+    ["Mike", "--", "-1", "-x"],
+    ["Mike", "child", "Kara", "--alive"],
+    ["-q", "Mike", "1", "", "extra"],
+    ["-", "1", "--level"],
+    ["Mike", "not-a-number"],
+    ["Mike", "--levle", "3"],
+    ["Mike", "1", "-x"],
+    ["Mike", "1", "chidl"],
+]
+
+
+def parse_state(args, parse_args):
+    command = Main(context=None)
+    compiled = compile_command(command)
+    try:
+        next_command, remaining = parse_args(compiled, args)
+        outcome = (next_command, list(remaining))
+    except Exception as error:
+        outcome = type(error)
+
+    outer = command.outer
+    state = {
+        name: getattr(outer, name)
+        for name in ("name", "age", "files", "alive", "quiet", "verbose")
+    }
+    state.update(level=outer.inner.level, tags=outer.inner.tags)
+    return outcome, state
+
+
+@pytest.mark.parametrize("args", ARGS)
+def test_specialized_matches_generic(args):
+    specialized = specialized_parser(Main, compile_command_type(Main))
+
+    assert parse_state(args, Parser.parse_args) == parse_state(args, specialized)
+
+
+@pytest.mark.parametrize("args", ARGS[:4])
+def test_specialized_matches_generic_streamed(args):
+    specialized = specialized_parser(Main, compile_command_type(Main))
+
+    assert parse_state(iter(args), Parser.parse_args) == parse_state(
+        iter(args), specialized
+    )
+
+
+def test_specialized_parser_cached_per_class():
+    compiled = compile_command_type(Main)
+
+    assert specialized_parser(Main, compiled) is specialized_parser(Main, compiled)
+    assert SPECIALIZEDCACHE not in vars(Child)
+
+
+def test_generated_source_inlines_stores():
+    source, namespace = generate_parser_source(compile_command_type(Main))
+
+    assert "o0.alive = True" in source
+    assert "o0.verbose = (o0.verbose or 0) + 1" in source
+    assert int in namespace.values()
+
+
+def test_app_specialize():
+    main, child = App(Main, specialize=True).parse(["Mike", "-v", "child", "Kara"])
+
+    assert 1 == main.outer.verbose
+    assert "Kara" == child.outer.name
@@ -1,4 +1,12 @@
-from heated.command import Command, CommandMeta, get_command_meta, is_command
+import pytest
+
+from heated.command import (
+    Command,
+    CommandMeta,
+    LazyCommand,
+    get_command_meta,
+    is_command,
+)
 from heated.parameters import Argument, Parameters
 
 
@@ -74,3 +82,56 @@ def test_instantiate_with_parameters(mocker):
 
     assert "Mike" == main.person.name
     assert context is main.context
+
+
+def test_lazy_subcommand_saved():
+    class Main(Command):
+        child = LazyCommand("some.module:Child_Command")
+
+    result = get_command_meta(Main).subcommands["child"]
+
+    assert isinstance(result, LazyCommand)
+    assert "child-command" == result.name
+
+
+def test_lazy_subcommand_name():
+    lazy = LazyCommand("some.module:Child", name="kid")
+
+    assert "kid" == lazy.name
+
+
+def test_lazy_subcommand_invalid_path():
+    with pytest.raises(ValueError):
+        LazyCommand("some.module.Child")
+
+
+def test_lazy_subcommand_load():
+    lazy = LazyCommand("heated.command:Command")
+
+    assert Command is lazy.load()
+
+
+def test_inherited_parameters_instantiated(mocker):
+    class Person(Parameters):
+        name: str = Argument("NAME", default="Mike")
+
+    class Base(Command):
+        person: Person
+
+    class Main(Base):
+        ...
+
+    main = Main(context=mocker.Mock())
+
+    assert Person == get_command_meta(Main).parameters["person"]
+    assert "Mike" == main.person.name
+
+
+def test_inherited_lazy_subcommand():
+    class Base(Command):
+        child = LazyCommand("some.module:Child")
+
+    class Main(Base):
+        ...
+
+    assert "child" in get_command_meta(Main).subcommands
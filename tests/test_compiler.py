@@ -1,11 +1,19 @@
+from array import array
+from pathlib import Path
+
 import pytest
 
 from heated.compiler import (
+    CompilerAppend,
+    CompilerCount,
+    CompilerExtend,
     CompilerStore,
     CompilerStoreBool,
     CompilerArgument,
     CompilerOption,
+    OptionTrie,
     compile_command,
+    compile_command_type,
     compile_parameters,
     ParameterCollisionError,
 )
@@ -52,7 +60,7 @@ def test_compile_parameters_single_argument(mocker):
 
     action = result[0][0].action
     assert isinstance(action, CompilerStore)
-    assert m.person is action.owner
+    assert m.person is result[2][action.owner]
     assert "name" == action.member_name
     assert str is action.type_
 
@@ -70,7 +78,7 @@ def test_compile_parameters_single_option(mocker):
 
     action = result[1]["--name"].child
     assert isinstance(action, CompilerStore)
-    assert m.person is action.owner
+    assert m.person is result[2][action.owner]
     assert "name" == action.member_name
     assert str is action.type_
 
@@ -88,10 +96,29 @@ def test_compile_parameters_single_flag(mocker):
 
     action = result[1]["--alive"].child
     assert isinstance(action, CompilerStoreBool)
-    assert m.person is action.owner
+    assert m.person is result[2][action.owner]
     assert "alive" == action.member_name
 
 
+def test_compile_parameters_accumulating_actions():
+    class Build(Parameters):
+        includes: list[str] = Option("-I", action="append")
+        ids: array = Option("--ids", action="extend", default=array("l"))
+        verbose: int = Flag("-v", action="count")
+        files: list[Path] = Argument("FILES", nargs="+")
+
+    arguments, options, _ = compile_parameters(flatten_parameters(Build()))
+
+    assert isinstance(options["-I"].child, CompilerAppend)
+    assert str is options["-I"].child.type_
+    assert isinstance(options["--ids"].child, CompilerExtend)
+    assert "l" == options["--ids"].child.typecode
+    assert int is options["--ids"].child.type_
+    assert isinstance(options["-v"].child, CompilerCount)
+    assert "+" == arguments[0].nargs
+    assert Path is arguments[0].action.type_
+
+
 def test_compile_command(mocker):
     class Person(Parameters):
         name: str = Option("--name")
@@ -120,3 +147,96 @@ def test_compile_collision(mocker):
     
     with pytest.raises(ParameterCollisionError):
         compile_command(f)
+
+
+def test_compile_command_type_cached():
+    class Person(Parameters):
+        name: str = Option("--name")
+
+    class Main(Command):
+        person: Person
+
+    assert compile_command_type(Main) is compile_command_type(Main)
+
+
+def test_compile_command_type_not_inherited():
+    class Person(Parameters):
+        name: str = Option("--name")
+
+    class Main(Command):
+        person: Person
+
+    class Child(Main):
+        ...
+
+    assert compile_command_type(Main) is not compile_command_type(Child)
+
+
+def test_compile_command_binds_instances(mocker):
+    class Person(Parameters):
+        name: str = Option("--name")
+
+    class Main(Command):
+        person: Person
+
+    first = compile_command(Main(context=mocker.Mock()))
+    second = compile_command(Main(context=mocker.Mock()))
+
+    assert first.options is second.options
+    assert first.owners[0] is not second.owners[0]
+
+
+def test_compile_command_nested_owner_paths(mocker):
+    class Child(Parameters):
+        name: str = Option("--child-name")
+
+    class Parent(Parameters):
+        name: str = Option("--parent-name")
+        child: Child
+
+    class Main(Command):
+        parent: Parent
+
+    m = Main(context=mocker.Mock())
+    result = compile_command(m)
+
+    assert [("parent",), ("parent", "child")] == result.owner_paths
+    assert m.parent is result.owners[result.options["--parent-name"].child.owner]
+    assert m.parent.child is result.owners[result.options["--child-name"].child.owner]
+
+
+def test_option_trie_exact_and_prefix():
+    name, verbose = CompilerOption(None), CompilerOption(None)
+    trie = OptionTrie({"--name": name, "--verbose": verbose})
+
+    assert (name, 6) == trie.match("--name")
+    assert (verbose, 5) == trie.match("--ver")
+    assert (name, 4) == trie.match("--na=Mike")
+
+
+def test_option_trie_aliases_not_ambiguous():
+    verbose = CompilerOption(None)
+    trie = OptionTrie({"--verbose": verbose, "--verbosity": verbose})
+
+    assert (verbose, 6) == trie.match("--verb")
+
+
+def test_option_trie_no_match():
+    trie = OptionTrie({"--name": CompilerOption(None)})
+
+    assert None is trie.match("--age")[0]
+
+
+def test_option_trie_names():
+    trie = OptionTrie(
+        {"--verbose": CompilerOption(None), "--verbatim": CompilerOption(None)}
+    )
+
+    assert ["--verbatim", "--verbose"] == trie.names("--verb")
+
+
+def test_option_trie_bare_prefix_no_match():
+    trie = OptionTrie({"--name": CompilerOption(None)})
+
+    assert None is trie.match("--=x")[0]
+    assert None is trie.match("--")[0]
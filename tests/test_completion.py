@@ -0,0 +1,128 @@
+import subprocess
+import sys
+
+import heated.complete
+from heated.command import Command, LazyCommand
+from heated.complete import (
+    complete,
+    format_completions,
+    load_completion_index,
+    shell_script,
+)
+from heated.completion import build_completion_index, write_completion_index
+from heated.parameters import Argument, Flag, Option, Parameters
+
+
+class BranchParams(Parameters):
+    name: str = Argument("BRANCH")
+    list: bool = Flag("--list", "-l", help="List branches")
+
+
+class Branch(Command):
+    params: BranchParams
+
+
+class CommitParams(Parameters):
+    message: str = Option("--message", "-m", help="Commit message")
+    amend: bool = Flag("--amend")
+
+
+class Commit(Command):
+    params: CommitParams
+
+
+class Checkout(Command):
+    ...
+
+
+class Main(Command):
+    branch: Branch
+    commit: Commit
+    checkout = LazyCommand(f"{__name__}:Checkout")
+
+
+def names(completions):
+    return [name for name, _ in completions.candidates]
+
+
+def test_build_completion_index():
+    index = build_completion_index(Main)
+
+    assert {"branch", "commit", "checkout"} == set(index["subcommands"])
+    assert ["BRANCH"] == index["subcommands"]["branch"]["arguments"]
+    assert [True, "Commit message"] == index["subcommands"]["commit"]["options"]["-m"]
+
+
+def test_complete_subcommands():
+    index = build_completion_index(Main)
+
+    assert ["branch"] == names(complete(index, ["br"]))
+    assert ["branch", "checkout", "commit"] == names(complete(index, [""]))
+
+
+def test_complete_options():
+    index = build_completion_index(Main)
+    result = complete(index, ["commit", "--"])
+
+    assert [("--amend", ""), ("--message", "Commit message")] == result.candidates
+
+
+def test_complete_option_value():
+    index = build_completion_index(Main)
+
+    assert [] == names(complete(index, ["commit", "--message", ""]))
+    assert ["--amend"] == names(complete(index, ["commit", "--message=hi", "--a"]))
+
+
+def test_complete_argument_hint():
+    index = build_completion_index(Main)
+    result = complete(index, ["branch", "-l", ""])
+
+    assert "BRANCH" == result.argument
+
+
+def test_format_completions():
+    index = build_completion_index(Main)
+    result = complete(index, ["commit", "--m"])
+
+    assert "--message" == format_completions(result, "bash")
+    assert "--message:Commit message" == format_completions(result, "zsh")
+    assert "--message\tCommit message" == format_completions(result, "fish")
+
+
+def test_shell_script():
+    result = shell_script("bash", "my-git", "/tmp/index.bin", python="python3")
+
+    assert "complete -o default -F _heated_complete_my_git my-git" in result
+    assert f"python3 -S -E {heated.complete.__file__} /tmp/index.bin bash" in result
+
+
+def test_completion_main(tmp_path):
+    index_path = tmp_path / "index.bin"
+    write_completion_index(Main, index_path)
+
+    result = subprocess.run(
+        [sys.executable, "-S", "-E", heated.complete.__file__, str(index_path)]
+        + ["bash", "commit", "--a"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert ["--amend"] == result.stdout.split()
+
+
+def test_complete_module_imports_nothing_from_heated():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, heated.complete; "
+            "print(sorted(m for m in sys.modules if m.startswith('heated')))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "['heated', 'heated.complete']" == result.stdout.strip()
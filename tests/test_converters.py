@@ -0,0 +1,103 @@
+import enum
+import pickle
+from datetime import date
+from pathlib import Path
+from typing import List, Literal, Optional, Union
+
+import pytest
+
+from heated.compiler import CompilerStore
+from heated.converters import (
+    ConversionError,
+    convert_bool,
+    element_converter,
+    get_converter,
+    register_converter,
+)
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+def test_get_converter_plain_types():
+    assert 5 == get_converter(int)("5")
+    assert Path("a/b") == get_converter(Path)("a/b")
+    assert "text" == get_converter(str)("text")
+
+
+def test_get_converter_cached():
+    assert get_converter(Optional[int]) is get_converter(Optional[int])
+
+
+def test_get_converter_optional():
+    assert "text" == get_converter(Optional[str])("text")
+    assert 5 == get_converter(Optional[int])("5")
+
+
+def test_get_converter_union():
+    convert = get_converter(Union[int, float])
+
+    assert 5 == convert("5")
+    assert 2.5 == convert("2.5")
+    with pytest.raises(ConversionError):
+        convert("five")
+
+
+def test_get_converter_literal():
+    convert = get_converter(Literal["fast", "slow", 3])
+
+    assert "fast" == convert("fast")
+    assert 3 == convert("3")
+    with pytest.raises(ConversionError) as error:
+        convert("medium")
+    assert "one of fast, slow, 3" in str(error.value)
+
+
+def test_get_converter_enum():
+    convert = get_converter(Color)
+
+    assert Color.RED is convert("RED")
+    assert Color.GREEN is convert("green")
+    with pytest.raises(ConversionError):
+        convert("blue")
+
+
+def test_get_converter_sequence():
+    assert [1, 2, 3] == get_converter(list[int])("1,2,3")
+    assert (Color.RED,) == get_converter(tuple[Color, ...])("red")
+
+
+def test_element_converter():
+    assert 1 == element_converter(List[int])("1")
+    assert 1 == element_converter(int)("1")
+
+
+def test_registered_converters():
+    assert date(2020, 1, 2) == get_converter(date)("2020-01-02")
+    assert b"raw" == get_converter(bytes)("raw")
+    assert get_converter(bool) is convert_bool
+
+
+def test_register_converter():
+    class Point:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    register_converter(Point, lambda value: Point(*map(int, value.split("x"))))
+
+    assert 3 == get_converter(Point)("2x3").y
+
+
+def test_convert_bool():
+    assert convert_bool("yes")
+    assert not convert_bool("False")
+    with pytest.raises(ConversionError):
+        convert_bool("maybe")
+
+
+def test_store_converter_survives_pickle():
+    action = pickle.loads(pickle.dumps(CompilerStore(Optional[int], 0, "count")))
+
+    assert 5 == action.convert("5")
@@ -0,0 +1,95 @@
+import io
+import os
+import threading
+
+import pytest
+
+from heated.app import App
+from heated.client import run_client
+from heated.command import Command
+from heated.daemon import Daemon
+from heated.parameters import Argument, Parameters
+
+
+class Person(Parameters):
+    name: str = Argument("NAME")
+
+
+class Greet(Command):
+    person: Person
+
+    def invoke(self):
+        print(f"Hello {self.person.name}")
+        print(f"from {os.getcwd()} as {os.environ.get('GREETER')}")
+        self.context.exit_code = 4
+
+
+class Fail(Command):
+    def invoke(self):
+        raise RuntimeError("broken command")
+
+
+@pytest.fixture
+def serve(tmp_path):
+    daemons = []
+
+    def start(command):
+        daemon = Daemon(App(command), str(tmp_path / "heated.sock"))
+        thread = threading.Thread(
+            target=daemon.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        thread.start()
+        daemons.append((daemon, thread))
+        return daemon.socket_path
+
+    yield start
+
+    for daemon, thread in daemons:
+        daemon.shutdown()
+        daemon.server_close()
+        thread.join()
+
+
+def test_daemon_runs_command(serve, tmp_path):
+    socket_path = serve(Greet)
+    stdout = io.StringIO()
+
+    result = run_client(
+        socket_path,
+        ["Mike"],
+        env={"GREETER": "daemon"},
+        cwd=str(tmp_path),
+        stdout=stdout,
+    )
+
+    assert 4 == result
+    assert f"Hello Mike\nfrom {tmp_path} as daemon\n" == stdout.getvalue()
+
+
+def test_daemon_restores_environment(serve, tmp_path):
+    socket_path = serve(Greet)
+    cwd = os.getcwd()
+
+    run_client(socket_path, ["Mike"], env={}, cwd=str(tmp_path), stdout=io.StringIO())
+
+    assert cwd == os.getcwd()
+    assert "PATH" in os.environ
+
+
+def test_daemon_reports_errors(serve):
+    socket_path = serve(Fail)
+    stderr = io.StringIO()
+
+    result = run_client(socket_path, [], stdout=io.StringIO(), stderr=stderr)
+
+    assert 1 == result
+    assert "broken command" in stderr.getvalue()
+
+
+def test_daemon_serves_many_requests(serve):
+    socket_path = serve(Greet)
+
+    for name in ["Mike", "Kara"]:
+        stdout = io.StringIO()
+        run_client(socket_path, [name], stdout=stdout)
+        assert stdout.getvalue().startswith(f"Hello {name}\n")
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import threading
+import time
+
+from heated.app import App
+from heated.command import Command
+from heated.compiler import compile_command
+from heated.fanout import Jobs, invoke_fan_out
+from heated.context import Context
+from heated.parameters import Argument, Flag, Parameters
+from heated.parser import Parser
+
+
+class Targets(Parameters):
+    targets: list[int] = Argument("TARGETS", fan_out=True)
+    loud: bool = Flag("--loud")
+    jobs: Jobs
+
+
+class Process(Command):
+    params: Targets
+
+    def invoke(self):
+        # Later targets finish first, output must still come out in order
+        time.sleep(0.01 * (5 - self.params.targets))
+        print(f"target {self.params.targets} loud={self.params.loud}")
+        self.context.exit_code = self.params.targets % 3
+
+
+class ProcessPid(Command):
+    params: Targets
+
+    def invoke(self):
+        print(os.getpid())
+
+
+class ProcessContext(Command):
+    params: Targets
+
+    def invoke(self):
+        print(self.context.obj, self.context.resources)
+
+
+class Session:
+    def __init__(self):
+        self.loop = None
+        self.closed = False
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+
+def test_fan_out_argument_collects_values(mocker):
+    command = Process(context=mocker.Mock())
+    compiled = compile_command(command)
+
+    Parser.parse_args(compiled, ["1", "2", "--loud", "3"])
+
+    assert [1, 2, 3] == command.params.targets
+    assert command.params.loud
+    assert (0, "targets") == compiled.fan_out
+
+
+def test_fan_out_sequential(capsys):
+    result = App(Process).execute(["1", "2", "3"])
+
+    assert [
+        "target 1 loud=False",
+        "target 2 loud=False",
+        "target 3 loud=False",
+    ] == capsys.readouterr().out.splitlines()
+    assert 2 == result
+
+
+def test_fan_out_threads_keep_order(capsys):
+    threads = set()
+
+    class Recorded(Process):
+        def invoke(self):
+            threads.add(threading.get_ident())
+            super().invoke()
+
+    result = App(Recorded).execute(["--jobs", "4", "--loud", "1", "2", "3", "4"])
+
+    assert [f"target {n} loud=True" for n in range(1, 5)] == (
+        capsys.readouterr().out.splitlines()
+    )
+    assert 2 == result
+    assert len(threads) > 1
+
+
+def test_fan_out_processes(capsys):
+    result = App(ProcessPid).execute(["-j", "2", "--processes", "1", "2"])
+
+    pids = capsys.readouterr().out.split()
+    assert 0 == result
+    assert 2 == len(pids)
+    assert str(os.getpid()) not in pids
+
+
+def test_fan_out_no_targets(mocker):
+    command = Process(context=mocker.Mock(exit_code=0))
+    compiled = compile_command(command)
+
+    invoke_fan_out(command, compiled, command.context)
+
+    assert 0 == command.context.exit_code
+
+
+def test_fan_out_processes_get_fresh_context(capsys):
+    # A lock can't be pickled, it must not be sent to the worker processes
+    context = Context(obj=threading.Lock(), resources={"lock": threading.Lock()})
+
+    result = App(ProcessContext).execute(["-j", "2", "--processes", "1", "2"], context)
+
+    assert 0 == result
+    assert ["None {}", "None {}"] == capsys.readouterr().out.splitlines()
+
+
+def test_fan_out_async_shares_loop(capsys):
+    seen = []
+    running = []
+
+    class AsyncChild(Command, name="child"):
+        params: Targets
+
+        async def invoke(self):
+            session = self.context.resources["session"]
+            assert asyncio.get_running_loop() is session.loop
+            assert not session.closed
+            running.append(self.params.targets)
+            seen.append(len(running))
+            await asyncio.sleep(0.01 * (5 - self.params.targets))
+            running.remove(self.params.targets)
+            print(f"target {self.params.targets}")
+            self.context.exit_code = self.params.targets
+
+    class AsyncMain(Command):
+        child: AsyncChild
+
+        async def invoke(self):
+            session = await self.context.enter_async_context(Session())
+            self.context.resources["session"] = session
+
+    result = App(AsyncMain).execute(["child", "-j", "2", "1", "2", "3", "4"])
+
+    assert [f"target {n}" for n in range(1, 5)] == capsys.readouterr().out.splitlines()
+    assert 4 == result
+    assert 2 == max(seen)
@@ -0,0 +1,137 @@
+import sys
+
+import pytest
+
+from heated.app import App
+from heated.command import Command, LazyCommand
+from heated.freeze import (
+    FreezeError,
+    FrozenApp,
+    freeze_command,
+    load_entry,
+    split_chain,
+    write_frozen_module,
+)
+from heated.help import HelpRequested, help_text
+from heated.parameters import Argument, Flag, Option, Parameters
+
+
+class CommitParams(Parameters):
+    message: str = Option("--message", "-m", help="Commit message")
+    amend: bool = Flag("--amend", "-a")
+    files: list[str] = Argument("FILES", nargs="*")
+
+
+class Commit(Command):
+    """Record changes."""
+
+    params: CommitParams
+
+
+class RemoteParams(Parameters):
+    name: str = Argument("NAME")
+
+
+class Remote(Command):
+    params: RemoteParams
+    commit: Commit
+
+
+class Main(Command):
+    remote: Remote
+    commit: Commit
+
+
+app = App(Main)
+
+
+def test_freeze_command():
+    grammar = freeze_command(Main)
+    commit = grammar["subcommands"]["commit"]
+
+    assert "test_freeze:Main" == grammar["path"]
+    assert "Record changes." == commit["help"]
+    assert [True, "Commit message", 0] == commit["options"]["-m"]
+    assert [["FILES", "*", True, ""]] == commit["arguments"]
+    assert ["commit"] == list(grammar["subcommands"]["remote"]["subcommands"])
+
+
+def test_freeze_local_command():
+    class Local(Command):
+        ...
+
+    with pytest.raises(FreezeError):
+        freeze_command(Local)
+
+
+def test_load_entry():
+    assert Main is load_entry("test_freeze:app")
+    assert Commit is load_entry("test_freeze:Commit")
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        [],
+        ["commit", "-m", "remote", "a", "b"],
+        ["commit", "--mess=remote", "--amend"],
+        ["commit", "-am", "remote"],
+        ["remote", "origin", "commit", "a", "--", "commit"],
+        ["remote", "commit", "commit"],
+    ],
+)
+def test_split_chain_matches_parser(args):
+    commands = App(Main).parse(args)
+    chain = split_chain(freeze_command(Main), args)
+
+    assert [f"test_freeze:{type(c).__qualname__}" for c in commands] == [
+        node["path"] for node, _ in chain
+    ]
+
+
+def test_frozen_module(tmp_path):
+    path = tmp_path / "frozen_cli.py"
+    write_frozen_module(Main, path)
+
+    namespace = {}
+    exec(path.read_text(), namespace)
+
+    assert freeze_command(Main) == namespace["GRAMMAR"]
+
+
+def test_frozen_app_imports_selected_commands(tmp_path, monkeypatch):
+    (tmp_path / "frozen_entry.py").write_text(
+        "from heated.command import Command, LazyCommand\n"
+        "class Entry(Command):\n"
+        "    used = LazyCommand('frozen_used:Used')\n"
+        "    unused = LazyCommand('frozen_unused:Unused')\n"
+    )
+    for name in ("used", "unused"):
+        (tmp_path / f"frozen_{name}.py").write_text(
+            "from heated.command import Command\n"
+            "from heated.parameters import Argument, Parameters\n"
+            "class Params(Parameters):\n"
+            "    value: str = Argument('VALUE')\n"
+            f"class {name.title()}(Command):\n"
+            "    params: Params\n"
+        )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    grammar = freeze_command(LazyCommand("frozen_entry:Entry"))
+    for name in ("frozen_entry", "frozen_used", "frozen_unused"):
+        monkeypatch.delitem(sys.modules, name)
+
+    entry, used = FrozenApp(grammar).parse(["used", "value"])
+
+    assert "value" == used.params.value
+    assert "frozen_used" in sys.modules
+    assert "frozen_unused" not in sys.modules
+
+
+def test_frozen_app_help():
+    grammar = freeze_command(Main)
+
+    assert help_text(Commit) == grammar["subcommands"]["commit"]["help_text"]
+    with pytest.raises(HelpRequested) as request:
+        FrozenApp(grammar).parse(["remote", "origin", "commit", "-m", "-h", "--help"])
+    assert help_text(Commit) == request.value.text
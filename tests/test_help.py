@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from heated.app import App
+from heated.command import Command, LazyCommand
+from heated.help import HELPCACHE, HelpRequested, help_text, render_help
+from heated.parameters import Argument, Flag, Option, Parameters, Required
+
+
+class CopyParams(Parameters):
+    sources: list[str] = Argument("SOURCE", nargs="+", help="Files to copy")
+    target: str = Argument("TARGET")
+    mode: str = Option("--mode", "-m", help="Permissions of the copies")
+    force: bool = Flag("--force", help="Overwrite existing files")
+
+    needs_mode = Required("mode")
+
+
+class Copy(Command):
+    """Copy files.
+
+    Every source is copied into the target directory.
+    """
+
+    params: CopyParams
+
+
+class HostParams(Parameters):
+    # Takes -h for itself, only --help is added
+    host: str = Option("-h", "--host")
+
+
+class Main(Command):
+    """File tools."""
+
+    hosts: HostParams
+    copy: Copy
+    remote = LazyCommand("help_not_imported:Remote", help="Work on a remote host")
+
+
+def test_render_help():
+    text = render_help(Copy)
+
+    assert text.startswith("Usage: copy [OPTIONS] SOURCE... TARGET\n\nCopy files.\n")
+    assert "  SOURCE                    Files to copy\n" in text
+    assert "  -m, --mode MODE           Permissions of the copies\n" in text
+    assert "  --force                   Overwrite existing files\n" in text
+    assert "  -h, --help                Show this help and exit\n" in text
+
+
+def test_render_help_subcommands():
+    text = render_help(Main)
+
+    assert "  copy                      Copy files.\n" in text
+    assert "  remote                    Work on a remote host\n" in text
+    assert "  -h, --host HOST\n  --help " in text
+    assert "help_not_imported" not in sys.modules
+
+
+def test_help_text_cached_per_class():
+    text = help_text(Copy)
+
+    assert text is help_text(Copy)
+    assert text is vars(Copy)[HELPCACHE]
+    assert HELPCACHE not in vars(Main)
+
+
+@pytest.mark.parametrize("specialize", [False, True])
+def test_parse_help_option(specialize):
+    app = App(Main, specialize=specialize)
+
+    # Required groups aren't checked once help is asked for
+    with pytest.raises(HelpRequested) as request:
+        app.parse(["copy", "a", "--help"])
+    assert help_text(Copy) == request.value.text
+
+    # -h belongs to Main itself
+    with pytest.raises(HelpRequested) as request:
+        app.parse(["-h", "example.org", "--help"])
+    assert help_text(Main) == request.value.text
+
+
+def test_execute_prints_help(capsys):
+    assert 0 == App(Main).execute(["copy", "-h"])
+    assert help_text(Copy) == capsys.readouterr().out
@@ -1,17 +1,31 @@
+import pickle
+
 import pytest
 
 from heated.parameters import (
     Argument,
+    Exclusive,
     Flag,
     FlatParameter,
     Option,
     Parameters,
     flatten_parameters,
+    get_flat_parameters,
     get_param_meta,
     is_parameters,
+    ParametersValidationError,
+    validator,
 )
 
 
+class ForwardParent(Parameters):
+    child: "ForwardChild"
+
+
+class ForwardChild(Parameters):
+    name: str = Option("--name", default="Kara")
+
+
 @pytest.fixture
 def help_message():
     return "Help message"
@@ -44,6 +58,17 @@ def test_flag(help_message):
     assert help_message == f.help
 
 
+def test_parameter_actions():
+    assert "append" == Option("-I", action="append").action
+    assert 0 == Flag("-v", action="count").default
+    assert "+" == Argument("FILES", nargs="+").nargs
+
+    with pytest.raises(ValueError):
+        Option("-I", action="count")
+    with pytest.raises(ValueError):
+        Argument("FILES", nargs="many")
+
+
 def test_parameters_meta():
     class Child(Parameters):
         ...
@@ -206,3 +231,178 @@ def test_flatten_parameters_nested():
     assert p.child is result[1].owner
     assert "age" == result[1].member_name
     assert Child.age is result[1].parameter
+
+
+def test_inherited_definitions_merged():
+    class Base(Parameters):
+        name: str = Argument("NAME")
+
+    class Person(Base):
+        age: int = Option("--age")
+
+    meta = get_param_meta(Person)
+
+    assert Base.name is meta.definitions["name"]
+    assert Person.age is meta.definitions["age"]
+
+
+def test_inherited_definitions_flattened():
+    class Base(Parameters):
+        name: str = Argument("NAME")
+
+    class Person(Base):
+        age: int = Option("--age")
+
+    p = Person()
+    result = flatten_parameters(p)
+
+    assert {"name", "age"} == {flat.member_name for flat in result}
+
+
+def test_defaults_precomputed():
+    class Person(Parameters):
+        name: str = Argument("NAME", default="Mike")
+        alive: bool = Flag("--alive")
+
+    meta = get_param_meta(Person)
+
+    assert {"name": "Mike", "alive": False} == meta.defaults
+
+
+def test_option_without_annotation():
+    class Person(Parameters):
+        name = Option("--name")
+
+    p = Person()
+
+    assert None is p.name
+
+
+def test_forward_reference_resolved_lazily():
+    assert not get_param_meta(ForwardParent).resolved
+
+    p = ForwardParent()
+
+    assert get_param_meta(ForwardParent).resolved
+    assert ForwardChild is get_param_meta(ForwardParent).child_parameters["child"]
+    assert "Kara" == p.child.name
+
+
+def test_flat_parameters_cached():
+    class Child(Parameters):
+        name: str = Argument("CHILD_NAME")
+
+    class Parent(Parameters):
+        age: int = Option("--age")
+        child: Child
+
+    result = get_flat_parameters(Parent)
+
+    assert result is get_flat_parameters(Parent)
+    assert ((), "age", int) == (
+        result[0].owner,
+        result[0].member_name,
+        result[0].annotation,
+    )
+    assert (("child",), "name", str) == (
+        result[1].owner,
+        result[1].member_name,
+        result[1].annotation,
+    )
+
+
+def test_instances_use_slots():
+    class Child(Parameters):
+        name: str = Argument("CHILD_NAME")
+
+    class Parent(Parameters):
+        name: str = Argument("NAME")
+        child: Child
+
+    p = Parent()
+
+    assert isinstance(p, Parent)
+    assert not hasattr(p, "__dict__")
+    assert {"name", "child"} == set(type(p).__slots__)
+    assert Parent.name is get_param_meta(Parent).definitions["name"]
+
+
+def test_instances_reject_undeclared_attributes():
+    class Person(Parameters):
+        name: str = Argument("NAME")
+
+    p = Person()
+
+    with pytest.raises(AttributeError):
+        p.age = 42
+
+
+def test_instances_pickle():
+    p = ForwardParent()
+    p.child.name = "Mike"
+
+    result = pickle.loads(pickle.dumps(p))
+
+    assert isinstance(result, ForwardParent)
+    assert "Mike" == result.child.name
+
+
+def test_validators_precomputed():
+    class Range(Parameters):
+        start: int = Option("--start", default=0)
+        end: int = Option("--end", default=10)
+
+        @validator
+        def ordered(start, end):
+            if start > end:
+                raise ParametersValidationError("ordered", "start is after end")
+
+        @validator
+        def positive(start):
+            return start >= 0
+
+    meta = get_param_meta(Range)
+    ordered, positive = meta.validators
+
+    assert ("start", "end") == ordered.names
+    assert ("start",) == positive.names
+
+    instance = Range()
+    ordered(instance)
+    instance.start = -1
+    with pytest.raises(ParametersValidationError) as error:
+        positive(instance)
+    assert "positive" == error.value.validator
+
+
+def test_validator_unknown_parameter():
+    with pytest.raises(TypeError):
+
+        class Broken(Parameters):
+            start: int = Option("--start")
+
+            @validator
+            def check(start, missing):
+                ...
+
+
+def test_groups_declared():
+    class Output(Parameters):
+        json: bool = Flag("--json")
+        yaml: bool = Flag("--yaml")
+
+        formats = Exclusive("json", "yaml")
+
+    (formats,) = get_param_meta(Output).groups
+
+    assert isinstance(formats, Exclusive)
+    assert ("json", "yaml") == formats.names
+
+
+def test_group_unknown_parameter():
+    with pytest.raises(TypeError):
+
+        class Broken(Parameters):
+            json: bool = Flag("--json")
+
+            formats = Exclusive("json", "missing")
@@ -1,7 +1,19 @@
-from heated.command import Command
+import sys
+from array import array
+from typing import Literal, Optional
+
+import pytest
+
+from heated.command import Command, LazyCommand
 from heated.compiler import compile_command
 from heated.parameters import Argument, Flag, Option, Parameters
-from heated.parser import Parser
+from heated.compiler import AmbiguousOptionError
+from heated.parser import (
+    ArgumentCountError,
+    OptionValueError,
+    Parser,
+    UnknownOptionError,
+)
 
 
 def test_parse_option(mocker):
@@ -83,3 +95,311 @@ def test_parse_subcommand(mocker):
 
     assert Child is result_command
     assert ["--name", "Kara"] == result_remaining_args
+
+
+@pytest.fixture
+def lazy_module(tmp_path, monkeypatch):
+    (tmp_path / "lazy_child.py").write_text(
+        "from heated.command import Command\n\n\nclass Child(Command):\n    ...\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_child"
+    sys.modules.pop("lazy_child", None)
+
+
+def test_parse_lazy_subcommand(mocker, lazy_module):
+    class Main(Command):
+        child = LazyCommand(f"{lazy_module}:Child")
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+
+    assert lazy_module not in sys.modules
+
+    result_command, result_remaining_args = Parser.parse_args(compiled, ["child"])
+
+    assert sys.modules[lazy_module].Child is result_command
+    assert [] == result_remaining_args
+
+
+def test_parse_lazy_subcommand_not_selected(mocker, lazy_module):
+    class Person(Parameters):
+        name: str = Argument("NAME")
+
+    class Main(Command):
+        person: Person
+        child = LazyCommand(f"{lazy_module}:Child")
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["Mike"])
+
+    assert lazy_module not in sys.modules
+
+
+def test_parse_option_equals_value(mocker):
+    class Person(Parameters):
+        name: str = Option("--name")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["--name=Mike"])
+
+    assert "Mike" == m.person.name
+
+
+def test_parse_option_abbreviation(mocker):
+    class Person(Parameters):
+        name: str = Option("--name")
+        verbose: bool = Flag("--verbose")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["--verb", "--na=Mike"])
+
+    assert m.person.verbose
+    assert "Mike" == m.person.name
+
+
+def test_parse_option_ambiguous_abbreviation(mocker):
+    class Person(Parameters):
+        verbose: bool = Flag("--verbose")
+        verbatim: bool = Flag("--verbatim")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+
+    with pytest.raises(AmbiguousOptionError) as error:
+        Parser.parse_args(compiled, ["--verb"])
+
+    assert ["--verbatim", "--verbose"] == error.value.candidates
+
+
+def test_parse_flag_with_value(mocker):
+    class Person(Parameters):
+        alive: bool = Flag("--alive")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+
+    with pytest.raises(OptionValueError):
+        Parser.parse_args(compiled, ["--alive=yes"])
+
+
+def test_parse_short_flag_cluster(mocker):
+    class Person(Parameters):
+        alive: bool = Flag("-a")
+        brave: bool = Flag("-b")
+        name: str = Option("-n")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    result_command, result_remaining_args = Parser.parse_args(compiled, ["-abnMike"])
+
+    assert m.person.alive
+    assert m.person.brave
+    assert "Mike" == m.person.name
+    assert [] == result_remaining_args
+
+
+def test_parse_short_cluster_value_next_arg(mocker):
+    class Person(Parameters):
+        alive: bool = Flag("-a")
+        name: str = Option("-n")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["-an", "Mike"])
+
+    assert m.person.alive
+    assert "Mike" == m.person.name
+
+
+def test_parse_short_cluster_unknown(mocker):
+    class Person(Parameters):
+        alive: bool = Flag("-a")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+
+    with pytest.raises(UnknownOptionError):
+        Parser.parse_args(compiled, ["-ax"])
+
+
+def test_parse_unknown_long_option(mocker):
+    class Person(Parameters):
+        verbose: bool = Flag("--verbose")
+        version: bool = Flag("--version")
+        name: str = Argument("NAME")
+
+    class Main(Command):
+        person: Person
+
+    compiled = compile_command(Main(context=mocker.Mock()))
+
+    # Not taken as the positional NAME
+    with pytest.raises(UnknownOptionError) as error:
+        Parser.parse_args(compiled, ["--verbse=1"])
+    assert "--verbse" == error.value.option
+    assert ["--verbose"] == error.value.suggestions
+    assert "Unknown option: --verbse, did you mean --verbose?" == str(error.value)
+
+    with pytest.raises(UnknownOptionError) as error:
+        Parser.parse_args(compiled, ["--unrelated"])
+    assert [] == error.value.suggestions
+
+
+def test_parse_dash_argument_not_cluster(mocker):
+    class Person(Parameters):
+        alive: bool = Flag("-a")
+        number: str = Argument("NUMBER")
+
+    class Main(Command):
+        person: Person
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["-12"])
+
+    assert "-12" == m.person.number
+
+
+def test_parse_many_options(mocker):
+    names = {f"option_{index}": Option(f"--option-{index}") for index in range(2000)}
+    annotations = {attr_name: str for attr_name in names}
+    Many = type("Many", (Parameters,), {**names, "__annotations__": annotations})
+
+    class Main(Command):
+        many: Many
+
+    m = Main(context=mocker.Mock())
+    compiled = compile_command(m)
+    Parser.parse_args(compiled, ["--option-1999=last", "--option-10", "ten"])
+
+    assert "last" == m.many.option_1999
+    assert "ten" == m.many.option_10
+
+
+def test_parse_converts_annotations(mocker):
+    class Settings(Parameters):
+        mode: Literal["fast", "slow"] = Option("--mode")
+        level: Optional[int] = Option("--level")
+        name = Option("--name")
+
+    class Main(Command):
+        settings: Settings
+
+    m = Main(context=mocker.Mock())
+    Parser.parse_args(
+        compile_command(m), ["--mode", "slow", "--level", "3", "--name", "Mike"]
+    )
+
+    assert "slow" == m.settings.mode
+    assert 3 == m.settings.level
+    assert "Mike" == m.settings.name
+
+
+class Build(Parameters):
+    includes: list[str] = Option("-I", action="append")
+    ids: array = Option("--ids", action="extend", default=array("q"))
+    verbose: int = Flag("-v", action="count")
+    files: list[int] = Argument("FILES", nargs="*")
+
+
+def test_parse_append_extend_count(mocker):
+    class Main(Command):
+        build: Build
+
+    m = Main(context=mocker.Mock())
+    Parser.parse_args(
+        compile_command(m),
+        ["-I", "a", "-vv", "--ids", "1,2", "-I", "b", "--ids=3", "-v"],
+    )
+
+    assert ["a", "b"] == m.build.includes
+    assert array("q", [1, 2, 3]) == m.build.ids
+    assert 3 == m.build.verbose
+    # The shared default is left alone
+    assert array("q") == Build.ids.default
+
+
+def test_parse_nargs_consumes_until_option(mocker):
+    class Main(Command):
+        build: Build
+
+    m = Main(context=mocker.Mock())
+    Parser.parse_args(compile_command(m), ["1", "2", "3", "-v", "--", "-4"])
+
+    assert [1, 2, 3, -4] == m.build.files
+    assert 1 == m.build.verbose
+
+
+def test_parse_nargs_count(mocker):
+    class Pair(Parameters):
+        point: list[int] = Argument("POINT", nargs=2)
+        label: str = Argument("LABEL")
+
+    class Main(Command):
+        pair: Pair
+
+    m = Main(context=mocker.Mock())
+    Parser.parse_args(compile_command(m), ["1", "2", "origin"])
+
+    assert [1, 2] == m.pair.point
+    assert "origin" == m.pair.label
+
+    m = Main(context=mocker.Mock())
+    with pytest.raises(ArgumentCountError):
+        Parser.parse_args(compile_command(m), ["1", "-x"])
+
+
+def test_parse_streamed_args(mocker):
+    class Main(Command):
+        build: Build
+
+    def stream():
+        yield "-v"
+        yield from map(str, range(10000))
+
+    m = Main(context=mocker.Mock())
+    Parser.parse_args(compile_command(m), stream())
+
+    assert list(range(10000)) == m.build.files
+    assert 1 == m.build.verbose
+
+
+def test_parse_streamed_args_continue_in_subcommand(mocker):
+    class Child(Command):
+        ...
+
+    class Main(Command):
+        child: Child
+
+    m = Main(context=mocker.Mock())
+    args = iter(["child", "--name", "Kara"])
+    result_command, result_remaining_args = Parser.parse_args(compile_command(m), args)
+
+    assert Child is result_command
+    assert not isinstance(result_remaining_args, list)
+    assert ["--name", "Kara"] == list(result_remaining_args)
@@ -0,0 +1,61 @@
+import pstats
+import time
+
+import pytest
+
+from heated.profiling import SamplingProfiler, UnknownProfilerError, run_profiled
+
+
+def busy_work():
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+    return 42
+
+
+def test_run_profiled_cprofile(tmp_path):
+    path = tmp_path / "out.prof"
+
+    result = run_profiled(busy_work, path)
+
+    stats = pstats.Stats(str(path))
+    assert 42 == result
+    assert any(name == "busy_work" for _, _, name in stats.stats)
+
+
+def test_run_profiled_sample(tmp_path):
+    path = tmp_path / "out.collapsed"
+
+    result = run_profiled(busy_work, path, "sample")
+
+    lines = path.read_text().splitlines()
+    assert 42 == result
+    assert lines
+    assert any(":busy_work" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_run_profiled_writes_on_error(tmp_path):
+    path = tmp_path / "out.prof"
+
+    def broken():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        run_profiled(broken, path)
+
+    assert path.exists()
+
+
+def test_run_profiled_unknown_profiler(tmp_path):
+    with pytest.raises(UnknownProfilerError):
+        run_profiled(busy_work, tmp_path / "out", "perf")
+
+
+def test_sampling_profiler_other_thread():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_work()
+    profiler.stop()
+
+    assert sum(profiler.samples.values()) > 0
@@ -0,0 +1,139 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from heated.app import App
+from heated.command import Command
+from heated.parameters import Argument, Flag, Option, Parameters
+from heated.sources import (
+    ConfigCache,
+    ConfigError,
+    Sources,
+    _parsed_configs,
+    load_config,
+)
+
+
+class Server(Parameters):
+    host: str = Option(
+        "--host", default="localhost", env="APP_HOST", config="server.host"
+    )
+    port: int = Option("--port", default=80, env="APP_PORT", config="server.port")
+    tags: list[str] = Option("--tag", action="append", config="server.tags")
+    debug: bool = Flag("--debug", env="APP_DEBUG")
+    verbose: int = Flag("-v", action="count", config="verbose")
+    name: str = Argument("NAME", default="main", config="name")
+
+
+class Main(Command):
+    server: Server
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "app.toml"
+    path.write_text(
+        'verbose = 2\n[server]\nhost = "example.com"\nport = 8080\ntags = ["a", "b"]\n'
+    )
+    return path
+
+
+def parse(args, **sources):
+    return App(Main, sources=Sources(**sources)).parse(args)[0].server
+
+
+def test_defaults_without_sources():
+    server = parse([], environ={})
+
+    assert "localhost" == server.host
+    assert 80 == server.port
+
+
+def test_config_values(config_path):
+    server = parse([], config_files=[config_path], environ={})
+
+    assert "example.com" == server.host
+    assert 8080 == server.port
+    assert ["a", "b"] == server.tags
+    assert 2 == server.verbose
+    assert "main" == server.name
+
+
+def test_precedence(config_path):
+    environ = {"APP_HOST": "env.example.com", "APP_PORT": "9000", "APP_DEBUG": "yes"}
+    server = parse(["--port", "1"], config_files=[config_path], environ=environ)
+
+    assert "env.example.com" == server.host
+    assert 1 == server.port
+    assert server.debug
+
+
+def test_last_config_file_wins(config_path, tmp_path):
+    override = tmp_path / "override.json"
+    override.write_text(json.dumps({"server": {"port": 1234}}))
+
+    server = parse([], config_files=[config_path, override], environ={})
+
+    assert "example.com" == server.host
+    assert 1234 == server.port
+
+
+def test_missing_config_file_ignored(tmp_path):
+    server = parse([], config_files=[tmp_path / "missing.toml"], environ={})
+
+    assert "localhost" == server.host
+
+
+def test_unknown_config_type(tmp_path):
+    path = tmp_path / "app.ini"
+    path.write_text("")
+
+    with pytest.raises(ConfigError):
+        load_config(path)
+
+
+def test_load_config_cached_until_modified(tmp_path, mocker):
+    path = tmp_path / "app.json"
+    path.write_text('{"name": "first"}')
+    parse_config = mocker.patch(
+        "heated.sources.parse_config",
+        side_effect=lambda config_path: json.loads(Path(config_path).read_text()),
+    )
+
+    assert {"name": "first"} == load_config(path)
+    assert {"name": "first"} == load_config(path)
+    assert 1 == parse_config.call_count
+
+    path.write_text('{"name": "second!"}')
+    assert {"name": "second!"} == load_config(path)
+    assert 2 == parse_config.call_count
+
+
+def test_config_cache_persisted(tmp_path, mocker):
+    path = tmp_path / "app.json"
+    path.write_text('{"name": "cached"}')
+    cache_path = tmp_path / "cache" / "config.pickle"
+
+    Sources([path], cache=ConfigCache(cache_path)).load_configs()
+    _parsed_configs.clear()
+    parse_config = mocker.patch("heated.sources.parse_config")
+
+    assert [{"name": "cached"}] == Sources(
+        [path], cache=ConfigCache(cache_path)
+    ).load_configs()
+    parse_config.assert_not_called()
+
+
+def test_configs_not_read_without_config_keys(config_path, mocker):
+    class Env(Parameters):
+        host: str = Option("--host", env="APP_HOST")
+
+    class EnvOnly(Command):
+        env: Env
+
+    load_configs = mocker.spy(Sources, "load_configs")
+    sources = Sources([config_path], environ={"APP_HOST": "h"})
+
+    assert "h" == App(EnvOnly, sources=sources).parse([])[0].env.host
+    load_configs.assert_not_called()
@@ -0,0 +1,48 @@
+import pickle
+
+from heated.suggest import NgramIndex, did_you_mean, edit_distance, ngrams
+
+
+def test_ngrams_ignore_dashes():
+    assert {"^v", "ve", "er", "r$"} == ngrams("--ver")
+    assert {"^v", "v$"} == ngrams("-v")
+
+
+def test_edit_distance():
+    assert 0 == edit_distance("commit", "commit")
+    assert 1 == edit_distance("comit", "commit")
+    # A swap is a single edit
+    assert 1 == edit_distance("chlid", "child")
+    assert 3 == edit_distance("", "add")
+
+
+def test_suggest_ranked_by_distance():
+    index = NgramIndex(["--verbose", "--version", "--verify", "--quiet"])
+
+    assert ["--verbose"] == index.suggest("--verbos")
+    assert ["--version"] == index.suggest("--versoin")
+    assert [] == index.suggest("--loud")
+
+
+def test_suggest_limit():
+    names = [f"command-{index}" for index in range(5000)]
+    index = NgramIndex(names)
+
+    assert ["command-4999"] == index.suggest("command-4999x", limit=1)
+    assert 3 == len(index.suggest("command-12"))
+
+
+def test_index_built_lazily():
+    names = {"commit": None, "checkout": None}
+    index = NgramIndex(names)
+
+    assert None is index._postings
+    assert ["commit"] == index.suggest("comit")
+    assert ["commit"] in index.postings.values()
+    assert ["commit"] == pickle.loads(pickle.dumps(index)).suggest("comit")
+
+
+def test_did_you_mean():
+    assert "" == did_you_mean([])
+    assert ", did you mean add?" == did_you_mean(["add"])
+    assert ", did you mean one of add, and?" == did_you_mean(["add", "and"])
@@ -0,0 +1,36 @@
+from heated.timing import PhaseRecorder, PhaseTiming, format_timings
+
+
+def test_phase_recorder():
+    timings = []
+    recorder = PhaseRecorder(timings)
+
+    started = recorder.start()
+    recorder.stop("main", "parse", started)
+
+    assert 1 == len(timings)
+    assert ("main", "parse") == (timings[0].command, timings[0].phase)
+    assert timings[0].seconds >= 0
+    assert None is timings[0].allocations
+
+
+def test_phase_recorder_allocations():
+    timings = []
+    recorder = PhaseRecorder(timings, trace_allocations=True)
+
+    started = recorder.start()
+    blocks = [object() for _ in range(1000)]
+    recorder.stop("main", "invoke", started)
+
+    assert timings[0].allocations >= len(blocks)
+
+
+def test_format_timings():
+    result = format_timings(
+        [PhaseTiming("main", "parse", 0.001), PhaseTiming("main", "invoke", 0.002, 5)]
+    )
+
+    lines = result.splitlines()
+    assert "main" in lines[0] and "parse" in lines[0] and "1.000 ms" in lines[0]
+    assert "5 blocks" in lines[1]
+    assert lines[2].startswith("total") and "3.000 ms" in lines[2]